@@ -1,8 +1,14 @@
-import importlib
+import collections
+import contextlib
+import json
+import mmap
+import os
+import sys
 import time
 import re
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Union, List, Iterable
+from typing import Any, BinaryIO, Dict, Optional, Union, List, Iterable, Tuple
 
 
 def ints(s: str, sep=" "):
@@ -13,6 +19,18 @@ def lines(f: Union[str, Path], encoding=None):
     return Path(f).read_text(encoding=encoding).splitlines()
 
 
+def stream_lines(f: BinaryIO, encoding="utf-8"):
+    """
+    Lines of a binary file object, without their line ending, read lazily.
+
+    >>> import io
+    >>> list(stream_lines(io.BytesIO(b"a 1\\nb 2\\r\\n")))
+    ['a 1', 'b 2']
+    """
+    for line in f:
+        yield line.decode(encoding).rstrip("\r\n")
+
+
 def clip(x, x_min, x_max):
     return min(max(x, x_min), x_max)
 
@@ -33,6 +51,52 @@ def parse_pos_ints(s: str) -> List[int]:
     return lmap(int, re.findall(r"\d+", s))
 
 
+def parse_ints_array(buf, columns=None, signed=True):
+    """
+    Bulk version of ``parse_ints`` (``parse_pos_ints`` if not ``signed``),
+    returns a numpy int64 array, reshaped to ``(rows, columns)`` if given.
+
+    ``buf`` can be a str or any buffer (bytes, mmap...). Numbers are parsed
+    with whole-array operations, grouped by number of digits, without creating
+    Python objects. Numbers must fit in an int64.
+
+    >>> parse_ints_array("x=-3, y=12\\nx=4, y=-567", columns=2).tolist()
+    [[-3, 12], [4, -567]]
+    >>> parse_ints_array(b"1-2", signed=False).tolist()
+    [1, 2]
+    """
+    import numpy as np
+
+    if isinstance(buf, str):
+        buf = buf.encode()
+    a = np.frombuffer(buf, dtype=np.uint8)
+    is_digit = (a >= ord("0")) & (a <= ord("9"))
+    edges = np.flatnonzero(
+        np.diff(is_digit.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    )
+    del is_digit
+    # Runs of digits, as [start, start + length)
+    starts, lengths = edges[::2], edges[1::2] - edges[::2]
+    digits = a - np.uint8(ord("0"))
+
+    values = np.empty(len(starts), dtype=np.int64)
+    for n in np.flatnonzero(np.bincount(lengths)).tolist():
+        idx = np.flatnonzero(lengths == n)
+        pos = starts[idx]
+        v = np.zeros(len(idx), dtype=np.int64)
+        for _ in range(n):
+            v *= 10
+            v += digits[pos]
+            pos += 1
+        values[idx] = v
+    if signed:
+        negative = (starts > 0) & (a[starts - 1] == ord("-"))
+        values[negative] *= -1
+    if columns is not None:
+        values = values.reshape(-1, columns)
+    return values
+
+
 def parse_words(s: str):
     return re.findall(r"[a-zA-Z]+", s)
 
@@ -50,19 +114,141 @@ def flatten(l):
     return [i for x in l for i in x]
 
 
+class BoundsDict(dict):
+    """
+    ``(x, y) -> value`` dict maintaining the bounds of its keys on writes and,
+    optionally, the keys of each row and each column.
+
+    >>> d = BoundsDict({(0, 0): "#"}, index_rows=True, index_cols=True)
+    >>> d[2, 5] = "#"
+    >>> d[2, 3] = "#"
+    >>> d.limits(), d.row(5), d.column(2), d.column_max(2)
+    (((0, 2), (0, 5)), {2}, {3, 5}, 5)
+    >>> del d[2, 5]
+    >>> d.limits(), d.column_max(2)
+    (((0, 2), (0, 3)), 3)
+    """
+
+    def __init__(self, data=(), index_rows=False, index_cols=False):
+        super().__init__()
+        self.index_rows = index_rows
+        self.index_cols = index_cols
+        # [x_min, x_max, y_min, y_max], None when empty or unknown after a
+        # deletion.
+        self._bounds = None
+        self._bounds_valid = True
+        self._rows = collections.defaultdict(set) if index_rows else None
+        self._cols = collections.defaultdict(set) if index_cols else None
+        self._col_max = {} if index_cols else None
+        self.update(data)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), self.index_rows, self.index_cols)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        x, y = key
+        b = self._bounds
+        if b is None:
+            if self._bounds_valid:
+                self._bounds = [x, x, y, y]
+        else:
+            if x < b[0]:
+                b[0] = x
+            elif x > b[1]:
+                b[1] = x
+            if y < b[2]:
+                b[2] = y
+            elif y > b[3]:
+                b[3] = y
+        if self._rows is not None:
+            self._rows[y].add(x)
+        if self._cols is not None:
+            self._cols[x].add(y)
+            if y > self._col_max.get(x, y - 1):
+                self._col_max[x] = y
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._forget(key)
+
+    def _forget(self, key):
+        x, y = key
+        self._bounds = None
+        self._bounds_valid = False
+        if self._rows is not None:
+            self._rows[y].discard(x)
+            if not self._rows[y]:
+                del self._rows[y]
+        if self._cols is not None:
+            self._cols[x].discard(y)
+            if not self._cols[x]:
+                del self._cols[x]
+                del self._col_max[x]
+            elif self._col_max[x] == y:
+                self._col_max[x] = max(self._cols[x])
+
+    def pop(self, key, *default):
+        if key in self:
+            value = super().pop(key)
+            self._forget(key)
+            return value
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._forget(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def clear(self):
+        super().clear()
+        self.__init__((), self.index_rows, self.index_cols)
+
+    def limits(self):
+        if not self._bounds_valid:
+            self._bounds = None
+            if len(self) > 0:
+                xs = [x for x, _ in self.keys()]
+                ys = [y for _, y in self.keys()]
+                self._bounds = [min(xs), max(xs), min(ys), max(ys)]
+            self._bounds_valid = True
+        if self._bounds is None:
+            return (0, 0), (0, 0)
+        x_min, x_max, y_min, y_max = self._bounds
+        return (x_min, x_max), (y_min, y_max)
+
+    def row(self, y):
+        """
+        x coordinates of the keys on row ``y`` (requires ``index_rows``).
+        """
+        return self._rows.get(y, set())
+
+    def column(self, x):
+        """
+        y coordinates of the keys on column ``x`` (requires ``index_cols``).
+        """
+        return self._cols.get(x, set())
+
+    def column_max(self, x, default=None):
+        return self._col_max.get(x, default)
+
+
 class SparseMap:
-    def __init__(self, data, default):
+    def __init__(self, data, default, index_rows=False, index_cols=False):
         self.default = default
-        self.data = data
+        self.data = BoundsDict(data, index_rows=index_rows, index_cols=index_cols)
 
     def limits(self):
-        if len(self.data) == 0:
-            return (0, 0), (0, 0)
-        xs = [x for x, _ in self.data.keys()]
-        ys = [y for _, y in self.data.keys()]
-        xmin, xmax = min(xs), max(xs)
-        ymin, ymax = min(ys), max(ys)
-        return (xmin, xmax), (ymin, ymax)
+        return self.data.limits()
 
     @classmethod
     def from_lines(cls, lines, default=" "):
@@ -91,6 +277,15 @@ class SparseMap:
         self.data[key] = value
 
 
+def __getattr__(name):
+    # numpy backed helpers are imported on first use
+    if name == "Grid":
+        from aoc.grid import Grid
+
+        return Grid
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def transpose(l):
     """
     >>> transpose([[1, 2, 3], [4, 5, 6]])
@@ -131,61 +326,273 @@ class Str:
         self.value = value
 
 
+@dataclass
+class StageResult:
+    name: str
+    elapsed: float
+    value: Any = None
+    expected: Any = None
+    cache_hit: Optional[bool] = None
+    # Peak memory increase and peak Python allocations, in bytes
+    rss_peak: Optional[int] = None
+    traced_peak: Optional[int] = None
+    # Why the stage did not complete, for stages run out of process
+    error: Optional[str] = None
+    # Hits, misses and evictions of the aoc.memo caches, by function
+    memo: Optional[Dict[str, Tuple[int, int, int]]] = None
+
+    @property
+    def ok(self):
+        if self.error is not None:
+            return False
+        return self.expected is None or self.value == self.expected
+
+
+@dataclass
+class RunResult:
+    day: str
+    key: str
+    stages: List[StageResult] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return all(s.ok for s in self.stages)
+
+    @property
+    def elapsed(self):
+        return sum(s.elapsed for s in self.stages)
+
+
+def format_stage(prefix: str, stage: StageResult):
+    from aoc.memory import format_size
+
+    stats = f"elapsed: {stage.elapsed:.4f}s"
+    if stage.rss_peak is not None:
+        stats += f", peak rss: +{format_size(stage.rss_peak)}"
+    if stage.traced_peak is not None:
+        stats += f", traced peak: {format_size(stage.traced_peak)}"
+    if stage.memo:
+        from aoc.memo import format_stats
+
+        stats += f", {format_stats(stage.memo)}"
+    if stage.name == "parse":
+        cache_status = ""
+        if stage.cache_hit is not None:
+            cache_status = "cache hit, " if stage.cache_hit else "cache miss, "
+        return f"{prefix}input loading ({cache_status}{stats})"
+    label = stage.name.replace("_", " ")
+    if stage.error is not None:
+        return f"{prefix}{label}: {C_RED}error: {stage.error}{C_ENDCOLOR} ({stats})"
+    err_status = ""
+    if not stage.ok:
+        err_status = f", {C_RED}expected: {stage.expected}{C_ENDCOLOR}"
+    return f"{prefix}{label}: {stage.value}{err_status} ({stats})"
+
+
+@dataclass
+class RunOptions:
+    # aoc.cache.ParseCache used to skip parse_input
+    cache: Any = None
+    # "cpu" or "mem", see aoc.profiling
+    profile: Optional[str] = None
+    profile_dir: Path = Path("profiles")
+    # Track Python allocations with tracemalloc, see aoc.memory
+    trace_mem: bool = False
+    # Compile the kernels of the days with numba, see aoc.jit
+    jit: bool = False
+
+
 class AocRunner:
-    def __init__(self, day, parse_input, part_1=None, part_2=None):
+    """
+    Runs a day on its inputs.
+
+    Inputs are read as a str and given to ``parse_input``, unless the day
+    declares one of the following, which keep large inputs out of memory:
+
+    * ``parse_buffer(buf)``, called with a read-only mmap of the input file.
+      The parsed value must not reference ``buf``, it is closed afterwards.
+    * ``parse_stream(f)``, called with the input file opened in binary mode.
+    """
+
+    def __init__(
+        self,
+        day,
+        parse_input,
+        part_1=None,
+        part_2=None,
+        module=None,
+        options=None,
+        parse_stream=None,
+        parse_buffer=None,
+    ):
         self.day = day
         self.parse_input = parse_input
         self.part_1 = part_1
         self.part_2 = part_2
+        self.module = module
+        self.options = options or RunOptions()
+        self.parse_stream = parse_stream
+        self.parse_buffer = parse_buffer
+
+    def parse(self, path: Path):
+        if self.parse_buffer is not None:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return self.parse_buffer(b"")
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    return self.parse_buffer(buf)
+        if self.parse_stream is not None:
+            with open(path, "rb") as f:
+                return self.parse_stream(f)
+        return self.parse_input(path.read_text())
+
+    def load(self, src, stage: StageResult):
+        if isinstance(src, Str):
+            return src.value
+        path = Path(src)
+        cache = self.options.cache
+        if cache is None or self.module is None:
+            return self.parse(path)
+
+        from aoc.cache import MISSING
+
+        key = cache.key(path, self.module)
+        input = cache.load(key)
+        stage.cache_hit = input is not MISSING
+        if not stage.cache_hit:
+            input = self.parse(path)
+            cache.store(key, input)
+        return input
+
+    def _profiled(self, key, stage_name):
+        if self.options.profile is None:
+            return contextlib.nullcontext()
+
+        from aoc.profiling import profiled
+
+        path = self.options.profile_dir / f"{self.day}.{key}.{stage_name}"
+        return profiled(self.options.profile, path)
 
     def run(self, src, part_1_check=None, part_2_check=None, prefix="", verbose=True):
-        t_parse = time.monotonic()
-        if isinstance(src, Str):
-            input = src.value
-        else:
-            input = self.parse_input(Path(src).read_text())
-        t_parse = time.monotonic() - t_parse
-        prefix = f"[{self.day}.{prefix}] "
-        print(f"{prefix}input loading (elapsed: {t_parse:.4f}s)")
-
-        if self.part_1:
-            t_part_1 = time.monotonic()
-            part1_sol = self.part_1(input)
-            t_part_1 = time.monotonic() - t_part_1
-            err_status = ""
-            if part_1_check is not None and part1_sol != part_1_check:
-                err_status = f", {C_RED}expected: {part_1_check}{C_ENDCOLOR}"
+        from aoc import jit, memo
+        from aoc.memory import measure
+
+        jit.enable(self.options.jit)
+        result = RunResult(self.day, prefix)
+        log_prefix = f"[{self.day}.{prefix}] "
+
+        stage = StageResult("parse", 0.0)
+        with self._profiled(prefix, stage.name), measure(stage, self.options.trace_mem):
+            t_parse = time.monotonic()
+            input = self.load(src, stage)
+            stage.elapsed = time.monotonic() - t_parse
+        result.stages.append(stage)
+        if verbose:
+            print(format_stage(log_prefix, stage))
+
+        for name, part, check in [
+            ("part_1", self.part_1, part_1_check),
+            ("part_2", self.part_2, part_2_check),
+        ]:
+            if not part:
+                continue
+            stage = StageResult(name, 0.0, expected=check)
+            memo.reset_stats()
+            with self._profiled(prefix, name), measure(stage, self.options.trace_mem):
+                t_part = time.monotonic()
+                try:
+                    stage.value = part(input)
+                finally:
+                    # Freed when the part returns, as a cache local to it
+                    # would be, instead of being kept for the next parts
+                    memo.clear_caches()
+                stage.elapsed = time.monotonic() - t_part
+            stage.memo = memo.stats() or None
+            result.stages.append(stage)
             if verbose:
-                print(
-                    f"{prefix}part 1: {part1_sol}{err_status} (elapsed: {t_part_1:.4f}s)"
-                )
+                print(format_stage(log_prefix, stage))
+        return result
 
-        if self.part_2:
-            t_part_2 = time.monotonic()
-            part2_sol = self.part_2(input)
-            t_part_2 = time.monotonic() - t_part_2
-            err_status = ""
-            if part_2_check is not None and part2_sol != part_2_check:
-                err_status = f", {C_RED}expected: {part_2_check}{C_ENDCOLOR}"
-            if verbose:
-                print(
-                    f"{prefix}part 2: {part2_sol}{err_status} (elapsed: {t_part_2:.4f}s)"
-                )
+
+def load_day(day):
+    # Unlike importlib.import_module, __import__ is reported by
+    # "python -X importtime", which backs --import-profile.
+    name = f"aoc.{day}"
+    __import__(name)
+    return sys.modules[name]
 
 
-def _load_module(day, m):
-    return AocRunner(day, m.parse_input, m.part_1, m.part_2), m.aoc_inputs()
+def _load_module(day, m, options=None):
+    runner = AocRunner(
+        day,
+        m.parse_input,
+        m.part_1,
+        m.part_2,
+        module=m,
+        options=options,
+        parse_stream=getattr(m, "parse_stream", None),
+        parse_buffer=getattr(m, "parse_buffer", None),
+    )
+    return runner, m.aoc_inputs()
 
 
-def aoc_run(day):
-    m = importlib.import_module(f"aoc.{day}")
-    runner, tests = _load_module(day, m)
+def _input_path(path):
+    if not isinstance(path, Str):
+        path = Path("assets") / path
+    return path
+
+
+def aoc_inputs(day):
+    m = load_day(day)
+    return m.aoc_inputs()
+
+
+def run_job(day, key, verbose=False, options=None):
+    """
+    Run a single input of a day, this is the unit of work of parallel sweeps.
+    """
+    m = load_day(day)
+    runner, tests = _load_module(day, m, options=options)
+    path, part_1_check, part_2_check = tests[key]
+    return runner.run(
+        _input_path(path),
+        part_1_check=part_1_check,
+        part_2_check=part_2_check,
+        prefix=key,
+        verbose=verbose,
+    )
+
+
+def aoc_run(day, options=None):
+    m = load_day(day)
+    runner, tests = _load_module(day, m, options=options)
+    results = []
     for k, (path, part_1_check, part_2_check) in tests.items():
-        if not isinstance(path, Str):
-            path = Path("assets") / path
-        runner.run(
-            path,
-            part_1_check=part_1_check,
-            part_2_check=part_2_check,
-            prefix=k,
+        results.append(
+            runner.run(
+                _input_path(path),
+                part_1_check=part_1_check,
+                part_2_check=part_2_check,
+                prefix=k,
+            )
         )
+    return results
+
+
+TIMINGS_FILE = Path(".aoc-timings.json")
+
+
+def load_timings(path: Path = TIMINGS_FILE) -> Dict[str, float]:
+    """
+    Total elapsed time of each "day.key" job, as recorded by previous runs.
+    """
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def record_timings(results: Iterable[RunResult], path: Path = TIMINGS_FILE):
+    timings = load_timings(path)
+    for r in results:
+        timings[f"{r.day}.{r.key}"] = r.elapsed
+    path.write_text(json.dumps(timings, indent=2, sort_keys=True))
@@ -1,10 +1,483 @@
-import aoc
+import argparse
+import json
+import re
 import sys
+from pathlib import Path
+
+import aoc
+from aoc import bench
+
+DAY_RANGE_RE = re.compile(r"day(\d+)\.\.day(\d+)")
+IMPORT_TIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def parse_days(specs):
+    """
+    >>> parse_days(["day3..day5", "day1"])
+    ['day3', 'day4', 'day5', 'day1']
+    >>> len(parse_days(["all"]))
+    25
+    """
+    days = []
+    for spec in specs:
+        if spec == "all":
+            spec = "day1..day25"
+        if m := DAY_RANGE_RE.fullmatch(spec):
+            lo, hi = map(int, m.groups())
+            days.extend(f"day{i}" for i in range(lo, hi + 1))
+        else:
+            days.append(spec)
+    return days
+
+
+def list_jobs(days):
+    return [(day, key) for day in days for key in aoc.aoc_inputs(day)]
+
+
+def sort_results(jobs, results, key=lambda r: r):
+    order = {job: i for i, job in enumerate(jobs)}
+    return sorted(results, key=lambda r: order[key(r).day, key(r).key])
+
+
+def schedule(jobs, timings):
+    """
+    The (day, key) jobs, longest first according to the recorded timings.
+
+    Jobs that were never timed are scheduled first, so that a single slow
+    unknown does not end up running alone at the end of the sweep.
+    """
+    return sorted(
+        jobs,
+        key=lambda j: timings.get(f"{j[0]}.{j[1]}", float("inf")),
+        reverse=True,
+    )
+
+
+def run_parallel(jobs, n_jobs, fn, **kwargs):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    results = []
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [executor.submit(fn, day, key, **kwargs) for day, key in jobs]
+        for f in as_completed(futures):
+            results.append(f.result())
+    return results
+
+
+def run_jobs(jobs, n_jobs, fn=None, **kwargs):
+    """
+    Results of ``fn(day, key, **kwargs)`` for the jobs. By default,
+    ``verify.check_job``: a job raising is reported as failed, and does not
+    stop the others.
+    """
+    if fn is None:
+        from aoc.verify import check_job as fn
+
+    if n_jobs == 1:
+        return [fn(day, key, **kwargs) for day, key in jobs]
+    return run_parallel(jobs, n_jobs, fn=fn, **kwargs)
+
+
+def run_bench(args, jobs, **kwargs):
+    """
+    Benchmark the jobs, ``kwargs`` are given to ``bench.bench_job``.
+    """
+    ordered = schedule(jobs, aoc.load_timings())
+    kwargs.update(warmup=args.warmup, repeat=args.repeat, options=args.options)
+    outcomes = run_jobs(ordered, args.jobs, fn=bench.bench_job, **kwargs)
+
+    outcomes = sort_results(jobs, outcomes, key=lambda o: o[0])
+    report = {}
+    for result, stats in outcomes:
+        prefix = f"[{result.day}.{result.key}] "
+        for stage in result.stages:
+            print(bench.format_stats(prefix, stage.name, stats[stage.name]))
+            if not stage.ok:
+                print(aoc.format_stage(prefix, stage))
+        report[f"{result.day}.{result.key}"] = stats
+    if args.bench_output:
+        bench.write_json(args.bench_output, report)
+
+    status = 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = bench.compare(report, baseline, threshold=args.threshold)
+        for regression in regressions:
+            print(f"{aoc.C_RED}{bench.format_regression(*regression)}{aoc.C_ENDCOLOR}")
+            status = 1
+    return [o[0] for o in outcomes], status
+
+
+def print_report(jobs, results):
+    results = sort_results(jobs, results)
+    for r in results:
+        prefix = f"[{r.day}.{r.key}] "
+        for stage in r.stages:
+            print(aoc.format_stage(prefix, stage))
+    if not results:
+        print("0 inputs")
+        return
+    total = sum(r.elapsed for r in results)
+    slowest = max(results, key=lambda r: r.elapsed)
+    failed = sum(not r.ok for r in results)
+    print(
+        f"{len(results)} inputs, {failed} failed, cumulated: {total:.4f}s, "
+        f"slowest: {slowest.day}.{slowest.key} ({slowest.elapsed:.4f}s)"
+    )
+
+
+def print_cache_summary(results):
+    hits = [s.cache_hit for r in results for s in r.stages if s.cache_hit is not None]
+    print(f"parse cache: {sum(hits)} hits, {len(hits) - sum(hits)} misses")
+
+
+def import_profile(argv, top=20):
+    """
+    Run the command again under ``python -X importtime`` and report the cost
+    of each top-level import, which includes the imports done by its
+    dependencies.
+    """
+    import subprocess
+
+    cmd = [sys.executable, "-X", "importtime", "-m", "aoc", *argv]
+    proc = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
+    costs = {}
+    for line in proc.stderr.splitlines():
+        m = IMPORT_TIME_RE.match(line)
+        if m is None:
+            print(line, file=sys.stderr)
+            continue
+        _, cumulative, indent, name = m.groups()
+        if len(indent) == 1:
+            costs[name] = costs.get(name, 0) + int(cumulative)
+    print(f"import profile (total: {sum(costs.values()) / 1000:.1f}ms):")
+    for name, us in sorted(costs.items(), key=lambda x: x[1], reverse=True)[:top]:
+        print(f"{us / 1000:10.1f}ms  {name}")
+    return proc.returncode
+
+
+def scale_main(argv):
+    from aoc import scaling
+
+    parser = argparse.ArgumentParser(
+        prog="python -m aoc scale",
+        description="fit the complexity of days on generated inputs",
+    )
+    parser.add_argument("days", nargs="+", help="days to run: dayN, dayA..dayB or all")
+    parser.add_argument("--min-scale", type=int, default=10, help="smallest input")
+    parser.add_argument("--max-scale", type=int, default=10**6, help="largest input")
+    parser.add_argument(
+        "--factor", type=float, default=2.0, help="ratio between successive scales"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generators")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=10.0,
+        help="stop growing a day once a run takes more seconds than this",
+    )
+    args = parser.parse_args(argv)
+
+    scales = scaling.geometric_range(args.min_scale, args.max_scale, args.factor)
+    for day in parse_days(args.days):
+        runs = scaling.scale_run(day, scales, seed=args.seed, budget=args.budget)
+        for name, (k, n_runs) in scaling.exponents(runs).items():
+            print(scaling.format_exponent(f"[{day}] ", name, k, n_runs))
+    return 0
+
+
+def history_main(argv):
+    from aoc import history
+
+    parser = argparse.ArgumentParser(
+        prog="python -m aoc history",
+        description="show the timing history of days and flag regressions",
+    )
+    parser.add_argument("days", nargs="+", help="days to show: dayN, dayA..dayB or all")
+    parser.add_argument(
+        "--window", type=int, default=10, help="number of runs of the rolling median"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown over the rolling median reported as a regression",
+    )
+    parser.add_argument("--last", type=int, default=10, help="runs shown per stage")
+    parser.add_argument(
+        "--db", type=Path, default=history.HISTORY_FILE, help="history database"
+    )
+    args = parser.parse_args(argv)
+
+    status = 0
+    for day in parse_days(args.days):
+        rows = history.load(day, args.db)
+        series = {}
+        for row in rows:
+            series.setdefault((row["key"], row["stage"]), []).append(row)
+        for (key, stage), rows in series.items():
+            flags = history.flag_regressions(
+                [row["elapsed"] for row in rows],
+                window=args.window,
+                threshold=args.threshold,
+            )
+            print(f"[{day}.{key}] {stage.replace('_', ' ')}: {len(rows)} runs")
+            for row, (median, regression) in list(zip(rows, flags))[-args.last :]:
+                print(history.format_row("  ", row, median, regression))
+            # Only the latest run fails the command, older regressions are
+            # either fixed or already known.
+            if flags[-1][1]:
+                status = 1
+    return status
+
+
+def verify_main(argv):
+    from aoc import verify
+
+    parser = argparse.ArgumentParser(
+        prog="python -m aoc verify",
+        description="check the answers of the days, the slowest inputs first",
+    )
+    parser.add_argument(
+        "days", nargs="*", default=["all"], help="days to check (default: all)"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of worker processes"
+    )
+    parser.add_argument(
+        "-x", "--fail-fast", action="store_true", help="stop at the first failure"
+    )
+    parser.add_argument(
+        "--jit",
+        action="store_true",
+        help="compile the numeric kernels of the days with numba",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="do not record the timings in the history database",
+    )
+    args = parser.parse_args(argv)
+    options = aoc.RunOptions(jit=args.jit)
+
+    checks = verify.collect(parse_days(args.days))
+    ordered = schedule([(day, key) for day, key, _ in checks], verify.costs())
+    results = []
+    for result in verify.run(ordered, args.jobs, args.fail_fast, options=options):
+        mark = "ok" if result.ok else f"{aoc.C_RED}FAIL{aoc.C_ENDCOLOR}"
+        print(f"[{result.day}.{result.key}] {mark} ({result.elapsed:.4f}s)")
+        results.append(result)
+
+    print()
+    for line in verify.format_table(checks, results):
+        print(line)
+    failed = sum(not r.ok for r in results)
+    skipped = len(checks) - len(results)
+    print(
+        f"{len(checks)} inputs, {len(results) - failed} passed, {failed} failed, "
+        f"{skipped} skipped, cumulated: {sum(r.elapsed for r in results):.4f}s"
+    )
+    # Jobs which raised have no meaningful timing
+    save_timings(args, [r for r in results if all(s.error is None for s in r.stages)])
+    return 1 if failed or skipped else 0
+
+
+def positive_int(value: str) -> int:
+    """
+    >>> positive_int("3")
+    3
+    """
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"expected at least 1, got {n}")
+    return n
+
+
+def add_run_arguments(parser):
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of worker processes"
+    )
+    parser.add_argument(
+        "--bench", action="store_true", help="time each input several times"
+    )
+    parser.add_argument("--warmup", type=int, default=1, help="discarded runs")
+    parser.add_argument("--repeat", type=positive_int, default=5, help="timed runs")
+    parser.add_argument(
+        "--bench-output", type=Path, help="write the statistics to a JSON file"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="JSON statistics to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown of a median reported as a regression",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="do not record the timings in the history database",
+    )
+
+
+def years_main(argv):
+    from aoc import years
+
+    parser = argparse.ArgumentParser(
+        prog="python -m aoc years",
+        description="run the Python solvers of every year",
+    )
+    parser.add_argument(
+        "years",
+        nargs="*",
+        default=[*years.YEARS, "2022"],
+        help="years to run (default: all)",
+    )
+    add_run_arguments(parser)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="seconds after which a solver of the other years is stopped, the "
+        "days of 2022 being run in process without one",
+    )
+    parser.add_argument(
+        "--answers", type=Path, help="JSON expected answers of the other years"
+    )
+    parser.add_argument(
+        "--save-answers",
+        type=Path,
+        metavar="PATH",
+        help="write the answers of the other years to a JSON file",
+    )
+    args = parser.parse_args(argv)
+    args.options = aoc.RunOptions()
+
+    jobs = []
+    for year in args.years:
+        if year == "2022":
+            jobs.extend(list_jobs(parse_days(["all"])))
+        else:
+            jobs.extend(years.list_jobs([year]))
+    kwargs = dict(timeout=args.timeout)
+    if args.answers:
+        kwargs["answers"] = json.loads(args.answers.read_text())
+
+    status = 0
+    if args.bench:
+        results, status = run_bench(args, jobs, run=years.run_any, **kwargs)
+    else:
+        ordered = schedule(jobs, aoc.load_timings())
+        results = run_jobs(ordered, args.jobs, run=years.run_any, **kwargs)
+        print_report(jobs, results)
+    if args.save_answers:
+        answers = {
+            f"{r.day}.{r.key}": [s.value for s in r.stages[1:]]
+            for r in results
+            if years.is_legacy(r.day) and r.ok
+        }
+        args.save_answers.write_text(json.dumps(answers, indent=2, sort_keys=True))
+    save_timings(args, results)
+    return max(status, int(not all(r.ok for r in results)))
+
+
+COMMANDS = {
+    "scale": scale_main,
+    "history": history_main,
+    "years": years_main,
+    "verify": verify_main,
+}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(prog="python -m aoc")
+    parser.add_argument("days", nargs="+", help="days to run: dayN, dayA..dayB or all")
+    add_run_arguments(parser)
+    parser.add_argument(
+        "--parse-cache",
+        type=Path,
+        nargs="?",
+        const=Path(".aoc-cache"),
+        metavar="DIR",
+        help="cache parsed inputs on disk (default directory: .aoc-cache)",
+    )
+    parser.add_argument(
+        "--parse-cache-size",
+        type=int,
+        default=512,
+        help="size limit of the parse cache, in MiB",
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="report the time spent importing each module",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cpu", "mem"],
+        help="profile each stage with cProfile or tracemalloc",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=Path("profiles"),
+        help="where the profiling reports are written",
+    )
+    parser.add_argument(
+        "--trace-mem",
+        action="store_true",
+        help="report the peak memory allocated by Python (slow)",
+    )
+    parser.add_argument(
+        "--jit",
+        action="store_true",
+        help="compile the numeric kernels of the days with numba",
+    )
+    args = parser.parse_args(argv)
+
+    if args.import_profile:
+        return import_profile([a for a in argv if a != "--import-profile"])
+
+    args.options = aoc.RunOptions(
+        profile=args.profile,
+        profile_dir=args.profile_dir,
+        trace_mem=args.trace_mem,
+        jit=args.jit,
+    )
+    if args.parse_cache:
+        from aoc.cache import ParseCache
+
+        size = args.parse_cache_size * 2**20
+        args.options.cache = ParseCache(args.parse_cache, size)
+
+    days = parse_days(args.days)
+    status = 0
+    if args.bench:
+        results, status = run_bench(args, list_jobs(days))
+    else:
+        jobs = list_jobs(days)
+        # The order only matters to keep the workers busy
+        ordered = jobs if args.jobs == 1 else schedule(jobs, aoc.load_timings())
+        results = run_jobs(ordered, args.jobs, options=args.options)
+        print_report(jobs, results)
+    if args.options.cache:
+        print_cache_summary(results)
+    save_timings(args, results)
+    return status
+
 
+def save_timings(args, results):
+    aoc.record_timings(results)
+    if not args.no_history:
+        from aoc import history
 
-def main():
-    aoc.aoc_run(sys.argv[1])
+        history.record(results)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main(sys.argv[1:]))
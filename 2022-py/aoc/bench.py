@@ -0,0 +1,117 @@
+"""
+Statistical benchmarking of days: warm-up, repetitions and per-stage
+statistics, with a JSON output that can be compared against a baseline.
+"""
+import json
+import math
+from pathlib import Path
+from typing import Dict, List
+
+import aoc
+from aoc.memory import format_size
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    >>> percentile([1, 2, 3, 4], 50)
+    2
+    >>> percentile([5, 1, 4, 2, 3], 95)
+    5
+    """
+    xs = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(xs)), 1)
+    return xs[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "min": min(samples),
+        "median": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "samples": len(samples),
+    }
+
+
+MEMORY_METRICS = ["rss_peak", "traced_peak"]
+
+
+def bench_job(day, key, warmup=1, repeat=5, options=None, run=aoc.run_job, **kwargs):
+    """
+    Run one input of a day several times with ``run``, returns the last result
+    and the statistics for each stage. ``kwargs`` are given to ``run``.
+
+    Memory peaks are reported as the maximum over the runs.
+    """
+    for _ in range(warmup):
+        run(day, key, options=options, **kwargs)
+    samples = {}
+    peaks = {}
+    result = None
+    for _ in range(repeat):
+        result = run(day, key, options=options, **kwargs)
+        for stage in result.stages:
+            samples.setdefault(stage.name, []).append(stage.elapsed)
+            stage_peaks = peaks.setdefault(stage.name, {})
+            for metric in MEMORY_METRICS:
+                value = getattr(stage, metric)
+                if value is not None:
+                    stage_peaks[metric] = max(stage_peaks.get(metric, 0), value)
+    stats = {name: summarize(xs) | peaks[name] for name, xs in samples.items()}
+    return result, stats
+
+
+def format_stats(prefix, name, stats):
+    memory = "".join(
+        f", {metric.replace('_', ' ')} {format_size(stats[metric])}"
+        for metric in MEMORY_METRICS
+        if metric in stats
+    )
+    return (
+        f"{prefix}{name.replace('_', ' ')}: min {stats['min']:.4f}s, "
+        f"median {stats['median']:.4f}s, p95 {stats['p95']:.4f}s{memory} "
+        f"({stats['samples']} runs)"
+    )
+
+
+def format_regression(job, name, metric, old, new):
+    if metric == "median":
+        old, new = f"{old:.4f}s", f"{new:.4f}s"
+    else:
+        old, new = format_size(old), format_size(new)
+    return f"regression: {job} {name} {metric.replace('_', ' ')} {old} -> {new}"
+
+
+def write_json(path: Path, report):
+    path.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+
+def compare(report, baseline, threshold=0.1, min_delta=1e-3, min_mem_delta=2**20):
+    """
+    Stages whose median got slower, or whose memory peaks got larger, than
+    the baseline by more than ``threshold`` (relative) and ``min_delta``
+    seconds or ``min_mem_delta`` bytes (absolute).
+
+    >>> base = {"day1.real": {"part_1": {"median": 1.0, "rss_peak": 2**20}}}
+    >>> compare({"day1.real": {"part_1": {"median": 1.05}}}, base)
+    []
+    >>> compare({"day1.real": {"part_1": {"median": 1.5}}}, base)
+    [('day1.real', 'part_1', 'median', 1.0, 1.5)]
+    >>> compare({"day1.real": {"part_1": {"median": 1.0, "rss_peak": 2**30}}}, base)
+    [('day1.real', 'part_1', 'rss_peak', 1048576, 1073741824)]
+    """
+    regressions = []
+    for job, stages in report.items():
+        for name, stats in stages.items():
+            ref = baseline.get(job, {}).get(name)
+            if ref is None:
+                continue
+            for metric in ["median"] + MEMORY_METRICS:
+                if metric not in ref or metric not in stats:
+                    continue
+                old, new = ref[metric], stats[metric]
+                delta = min_delta if metric == "median" else min_mem_delta
+                if new > old * (1 + threshold) and new - old > delta:
+                    regressions.append((job, name, metric, old, new))
+    return regressions
@@ -0,0 +1,80 @@
+"""
+On-disk cache of parsed inputs.
+
+Entries are keyed by a hash of the input file and of the source of the day
+module, so editing a day invalidates its entries. The cache is shared by the
+workers of parallel runs: writes are atomic and the eviction tolerates
+entries removed concurrently.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from types import ModuleType
+
+MISSING = object()
+
+
+class ParseCache:
+    def __init__(self, directory=Path(".aoc-cache"), max_size=512 * 2**20):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def key(self, path: Path, module: ModuleType) -> str:
+        h = hashlib.sha256()
+        h.update(Path(module.__file__).read_bytes())
+        with open(path, "rb") as f:
+            while chunk := f.read(2**20):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}.pickle"
+
+    def load(self, key):
+        """
+        The cached value, or ``MISSING``.
+        """
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return MISSING
+        # The modification time is used as the last access time for the LRU.
+        os.utime(path)
+        return pickle.loads(data)
+
+    def store(self, key, value) -> bool:
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return False
+        if len(data) > self.max_size:
+            return False
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in
+        ``max_size`` bytes.
+        """
+        entries = []
+        for p in self.directory.glob("*.pickle"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_size:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
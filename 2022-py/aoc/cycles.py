@@ -0,0 +1,119 @@
+"""
+Cycle detection for periodic simulations: find the ``mu`` steps before the
+cycle and its length ``lam``, then jump to any step ``n``.
+
+``floyd`` and ``brent`` only keep two states, when the next state is a
+function of the current one and stepping them twice is cheap. ``detect``
+instead hashes the keys of the states as the simulation yields them, which
+only runs it once; ``max_history`` bounds the number of keys kept, at the
+cost of only finding cycles shorter than it.
+"""
+import collections
+from typing import Callable, Hashable, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def _identity(x):
+    return x
+
+
+def floyd(
+    x0: T, step: Callable[[T], T], key: Callable[[T], Hashable] = _identity
+) -> Tuple[int, int]:
+    """
+    >>> floyd(0, lambda x: (x + 1) % 5 if x < 7 else 0)
+    (0, 5)
+    >>> floyd(3, lambda x: (x * x + 1) % 255)
+    (2, 6)
+    """
+    tortoise, hare = step(x0), step(step(x0))
+    while key(tortoise) != key(hare):
+        tortoise, hare = step(tortoise), step(step(hare))
+    mu, tortoise = 0, x0
+    while key(tortoise) != key(hare):
+        tortoise, hare = step(tortoise), step(hare)
+        mu += 1
+    lam, hare = 1, step(tortoise)
+    while key(tortoise) != key(hare):
+        hare = step(hare)
+        lam += 1
+    return mu, lam
+
+
+def brent(
+    x0: T, step: Callable[[T], T], key: Callable[[T], Hashable] = _identity
+) -> Tuple[int, int]:
+    """
+    Same as ``floyd``, with fewer calls to ``step``.
+
+    >>> brent(3, lambda x: (x * x + 1) % 255)
+    (2, 6)
+    """
+    power = lam = 1
+    tortoise, hare = x0, step(x0)
+    while key(tortoise) != key(hare):
+        if power == lam:
+            tortoise, power, lam = hare, power * 2, 0
+        hare = step(hare)
+        lam += 1
+    tortoise = hare = x0
+    for _ in range(lam):
+        hare = step(hare)
+    mu = 0
+    while key(tortoise) != key(hare):
+        tortoise, hare = step(tortoise), step(hare)
+        mu += 1
+    return mu, lam
+
+
+def detect(
+    keys: Iterable[Hashable], max_history: Optional[int] = None
+) -> Optional[Tuple[int, int]]:
+    """
+    ``(mu, lam)`` of the first key equal to a previous one, which is
+    consumed from ``keys`` up to it. None if ``keys`` runs out first.
+
+    >>> detect([3, 10, 101, 2, 5, 26, 167, 95, 101, 2])
+    (2, 6)
+    >>> detect("abcdbcd", max_history=2) is None
+    True
+    """
+    seen = {}
+    order = collections.deque()
+    for i, k in enumerate(keys):
+        if k in seen:
+            return seen[k], i - seen[k]
+        seen[k] = i
+        if max_history is not None:
+            order.append(k)
+            if len(order) > max_history:
+                del seen[order.popleft()]
+    return None
+
+
+def cycle_index(n: int, mu: int, lam: int) -> int:
+    """
+    The step before ``mu + lam`` whose state is the one of step ``n``.
+
+    >>> [cycle_index(n, 2, 3) for n in range(8)]
+    [0, 1, 2, 3, 4, 2, 3, 4]
+    """
+    if n < mu:
+        return n
+    return mu + (n - mu) % lam
+
+
+def extrapolate(n: int, mu: int, lam: int, value: Callable[[int], int]) -> int:
+    """
+    ``value(n)`` of a quantity growing by the same amount on each cycle,
+    from its ``value(i)`` for ``i <= mu + lam``.
+
+    >>> heights = [0, 1, 3, 4, 6]
+    >>> extrapolate(10, 1, 2, heights.__getitem__)
+    15
+    """
+    if n <= mu + lam:
+        return value(n)
+    cycles, rest = divmod(n - mu, lam)
+    return value(mu + rest) + cycles * (value(mu + lam) - value(mu))
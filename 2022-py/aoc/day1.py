@@ -1,3 +1,4 @@
+import random
 from typing import Sequence
 
 
@@ -23,6 +24,18 @@ def part_2(input):
     return sum(weight_sorted[:3])
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    Inventories of ``scale`` elves.
+    """
+    rng = random.Random(seed)
+    elves = []
+    for _ in range(max(scale, 3)):
+        items = [rng.randint(1000, 60000) for _ in range(rng.randint(1, 15))]
+        elves.append("\n".join(map(str, items)))
+    return "\n\n".join(elves) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day1-input-ex", 24000, 45000),
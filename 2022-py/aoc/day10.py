@@ -1,36 +1,12 @@
+import random
 from pathlib import Path
 
+import aoc
 
-class CPU:
-    def __init__(self, insn):
-        self.insn = insn
-        self.pc = 0
-        self.cycle = 0
-        self.remaining = []
-        self.x = 1
-
-    def advance(self):
-        self.cycle += 1
-        if self.remaining:
-            cycle, new_x = self.remaining[0]
-            if cycle == 0:
-                self.x = new_x
-                self.remaining.pop()
-            else:
-                self.remaining[0][0] -= 1
-
-        if not self.remaining:
-            opcode, arg = self.insn[self.pc]
-            self.pc += 1
-            if opcode == "noop":
-                pass
-            elif opcode == "addx":
-                self.remaining.append([1, self.x + arg])
 
-
-def parse_input(raw: str):
+def parse_lines(lines):
     cmds = []
-    for line in raw.splitlines():
+    for line in lines:
         ws = line.split()
         if ws[0] == "addx":
             cmds.append((ws[0], int(ws[1])))
@@ -41,31 +17,72 @@ def parse_input(raw: str):
     return cmds
 
 
-def part_1(input):
-    cpu = CPU(input)
-    match = [20, 60, 100, 140, 180, 220, 10000]
-    signals = []
-    for i in range(240):
-        cpu.advance()
-        if cpu.cycle == match[0]:
-            signals.append(match[0] * cpu.x)
-            match = match[1:]
-    return sum(signals)
+def parse_input(raw: str):
+    return parse_lines(raw.splitlines())
+
+
+def parse_stream(f):
+    return parse_lines(aoc.stream_lines(f))
+
+
+def x_timeline(program):
+    """
+    Value of X during each cycle, cycle 1 first: an addx takes two cycles,
+    after which X changes.
+
+    >>> x_timeline([("noop", []), ("addx", 3), ("addx", -5)]).tolist()
+    [1, 1, 1, 4, 4]
+    """
+    import numpy as np
+
+    is_addx = np.array([op == "addx" for op, _ in program], dtype=bool)
+    args = np.array([arg if op == "addx" else 0 for op, arg in program], dtype=np.int64)
+    # Cycle at the end of which each instruction completes
+    ends = np.cumsum(1 + is_addx)
+    deltas = np.zeros(ends[-1] if len(ends) else 0, dtype=np.int64)
+    deltas[ends - 1] = args
+    x = np.zeros_like(deltas)
+    np.cumsum(deltas[:-1], out=x[1:])
+    return x + 1
+
+
+def part_1(input, cycles=(20, 60, 100, 140, 180, 220)):
+    import numpy as np
+
+    x = x_timeline(input)
+    cycles = np.array(cycles)
+    cycles = cycles[cycles <= len(x)]
+    return int(np.sum(cycles * x[cycles - 1]))
 
 
 def part_2(input):
-    cpu = CPU(input)
-    crt = [["." for _ in range(40)] for _ in range(6)]
-    for i in range(6):
-        for j in range(40):
-            cpu.advance()
-            if abs(cpu.x - j) <= 1:
-                crt[i][j] = "#"
-    screen = "\n".join("".join(row) for row in crt)
+    import numpy as np
+
+    x = x_timeline(input)[:240].reshape(6, 40)
+    lit = np.abs(x - np.arange(40)) <= 1
+    screen = "\n".join("".join(row) for row in np.where(lit, "#", "."))
     print(screen)
     return screen
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    A program of ``scale`` instructions, at least the 240 needed by the CRT.
+    The register stays within the screen.
+    """
+    rng = random.Random(seed)
+    program = []
+    x = 1
+    for _ in range(max(scale, 240)):
+        if rng.random() < 0.3:
+            program.append("noop")
+        else:
+            dx = aoc.clip(x + rng.randint(-5, 5), 0, 39) - x
+            x += dx
+            program.append(f"addx {dx}")
+    return "\n".join(program) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": (
@@ -1,25 +1,36 @@
-import copy
+import itertools
+import math
+import random
 import re
-from collections import defaultdict
 from dataclasses import dataclass
-from typing import Sequence
+from typing import Callable, Sequence
 
-import aoc
+from aoc import cycles
+
+
+def compile_operation(op: str, op_arg: str) -> Callable:
+    """
+    The operation of a monkey, for a worry level or an array of them.
+
+    >>> compile_operation("*", "old")(7), compile_operation("+", "3")(7)
+    (49, 10)
+    """
+    if op_arg == "old":
+        return (lambda old: old * old) if op == "*" else (lambda old: old + old)
+    n = int(op_arg)
+    return (lambda old: old * n) if op == "*" else (lambda old: old + n)
 
 
 @dataclass
 class Monkey:
     items: list
     op: str
-    op_arg: int
+    op_arg: str
     test: (int, int, int)
+    operation: Callable = None
 
-    def update_worry(self, old: int) -> int:
-        op_arg = old if self.op_arg == "old" else int(self.op_arg)
-        if self.op == "+":
-            return old + op_arg
-        elif self.op == "*":
-            return old * op_arg
+    def __post_init__(self):
+        self.operation = compile_operation(self.op, self.op_arg)
 
     def test_worry(self, value: int) -> int:
         if value % self.test[0] == 0:
@@ -49,43 +60,194 @@ def parse_input(raw: str):
     return monkeys
 
 
-def turn(monkeys: Sequence[Monkey], items_inspected, div_reduce=None, mod_reduce=None):
-    for i in range(len(monkeys)):
-        m = monkeys[i]
-        items = m.items
-        m.items = []
-        items_inspected[i] += len(items)
-        for it in items:
-            new_value = m.update_worry(it)
-            if div_reduce:
-                new_value = new_value // 3
-            if mod_reduce:
-                new_value = new_value % mod_reduce
-            target = m.test_worry(new_value)
-            monkeys[target].items.append(new_value)
+def worry_dtype(monkeys, modulus):
+    """
+    int64 if the worry levels reduced by ``modulus`` cannot overflow it
+    through the operations, else Python ints.
+    """
+    import numpy as np
+
+    factors = [int(m.op_arg) for m in monkeys if m.op == "*" and m.op_arg != "old"]
+    if modulus is not None and modulus * max([modulus, *factors]) < 2**63:
+        return np.int64
+    return object
+
+
+def simulate(monkeys: Sequence[Monkey], rounds, relief=1, modulus=None):
+    """
+    Number of items inspected by each monkey over ``rounds``. The items of
+    a monkey are handled as one array per turn, and split between its two
+    targets.
+    """
+    import numpy as np
+
+    dtype = worry_dtype(monkeys, modulus)
+    pending = []
+    for m in monkeys:
+        # Reduced as the worry levels of the rounds are, for dtype to hold them
+        start = m.items if modulus is None else [w % modulus for w in m.items]
+        pending.append([np.array(start, dtype=dtype)])
+    inspected = np.zeros(len(monkeys), dtype=np.int64)
+    for _ in range(rounds):
+        for i, m in enumerate(monkeys):
+            if not pending[i]:
+                continue
+            items = (
+                pending[i][0] if len(pending[i]) == 1 else np.concatenate(pending[i])
+            )
+            pending[i] = []
+            inspected[i] += len(items)
+            items = m.operation(items)
+            if relief != 1:
+                items //= relief
+            if modulus is not None:
+                items %= modulus
+            divisor, if_true, if_false = m.test
+            divisible = items % divisor == 0
+            for target, batch in (
+                (if_true, items[divisible]),
+                (if_false, items[~divisible]),
+            ):
+                if len(batch):
+                    pending[target].append(batch)
+    return inspected
+
+
+def item_rounds(monkeys: Sequence[Monkey], monkey, worry, modulus, inspected):
+    """
+    The (monkey, worry) of an item at the start of each round, the number
+    of times each monkey inspected it so far being appended to
+    ``inspected`` along the way.
+    """
+    counts = [0] * len(monkeys)
+    while True:
+        inspected.append(list(counts))
+        yield monkey, worry
+        # The item is inspected again in the same round if it is thrown to a
+        # monkey coming later in the round.
+        while True:
+            m = monkeys[monkey]
+            counts[monkey] += 1
+            worry = m.operation(worry) % modulus
+            target = m.test_worry(worry)
+            monkey, thrown_back = target, target < monkey
+            if thrown_back:
+                break
+
+
+def simulate_periodic(monkeys: Sequence[Monkey], rounds, modulus, max_steps=None):
+    """
+    ``simulate`` without relief, following each item on its own: the
+    monkeys an item goes through in a round only depend on its monkey and
+    worry level at the start of the round, so its route is eventually
+    periodic and the inspections of the remaining rounds are extrapolated.
+    Items starting in the same state share their route. None if following
+    the routes takes more than ``max_steps`` rounds in total.
+    """
+    import numpy as np
+
+    routes = {}
+    steps = 0
+    totals = np.zeros(len(monkeys), dtype=np.int64)
+    for i, m in enumerate(monkeys):
+        for worry in m.items:
+            start = i, worry % modulus
+            if start not in routes:
+                limit = None if max_steps is None else max_steps - steps
+                found = route_inspections(monkeys, *start, rounds, modulus, limit)
+                if found is None:
+                    return None
+                routes[start], n_steps = found
+                steps += n_steps
+            totals += routes[start]
+    return totals
+
+
+def route_inspections(monkeys: Sequence[Monkey], monkey, worry, rounds, modulus, limit):
+    """
+    Inspections of each monkey over ``rounds`` for an item, and the number
+    of rounds followed to find them. None if that is more than ``limit``.
+    """
+    inspected = []
+    route = item_rounds(monkeys, monkey, worry, modulus, inspected)
+    n_steps = rounds + 1 if limit is None else min(rounds + 1, limit)
+    cycle = cycles.detect(itertools.islice(route, n_steps))
+    if cycle is not None:
+        counts = [
+            cycles.extrapolate(rounds, *cycle, lambda r: inspected[r][j])
+            for j in range(len(monkeys))
+        ]
+        return counts, len(inspected)
+    if len(inspected) <= rounds:
+        return None
+    return inspected[rounds], len(inspected)
+
+
+def monkey_business(inspected):
+    a, b = sorted(inspected)[-2:]
+    return int(a) * int(b)
 
 
 def part_1(input):
-    monkeys = copy.deepcopy(input)
-    items_inspected = defaultdict(int)
-    for i in range(20):
-        turn(monkeys, items_inspected, div_reduce=3)
-    print(items_inspected)
-    best = sorted(list(items_inspected.items()), key=lambda x: x[1], reverse=True)
-    return best[0][1] * best[1][1]
+    return monkey_business(simulate(input, 20, relief=3))
+
+
+def part_2(input, periodic=True):
+    """
+    With ``periodic``, the items are first followed on their own, which only
+    costs the rounds before their routes repeat. They move in batches if
+    that is not cheaper.
+    """
+    modulus = math.lcm(*(m.test[0] for m in input))
+    rounds = 10000
+    inspected = None
+    if periodic:
+        # Give up on the routes once they cost a fair part of the batches
+        inspected = simulate_periodic(input, rounds, modulus, max_steps=20 * rounds)
+    if inspected is None:
+        inspected = simulate(input, rounds, modulus=modulus)
+    return monkey_business(inspected)
 
 
-def part_2(input):
-    ppcm = aoc.prod([m.test[0] for m in input])
-    items_inspected = defaultdict(int)
-    for i in range(10000):
-        turn(input, items_inspected, mod_reduce=ppcm)
-    best = sorted(list(items_inspected.items()), key=lambda x: x[1], reverse=True)
-    return best[0][1] * best[1][1]
+def generate(scale: int, seed=0) -> str:
+    """
+    8 monkeys holding ``scale`` items (at least 8) between them.
+    """
+    rng = random.Random(seed)
+    n_monkeys = 8
+    # Every monkey starts with an item
+    owners = list(range(n_monkeys))
+    owners += [rng.randrange(n_monkeys) for _ in range(scale - n_monkeys)]
+    items = [[] for _ in range(n_monkeys)]
+    for i in owners:
+        items[i].append(rng.randint(50, 99))
+    divisors = rng.sample([2, 3, 5, 7, 11, 13, 17, 19], n_monkeys)
+    squared = rng.randrange(n_monkeys)
+    blocks = []
+    for i in range(n_monkeys):
+        if i == squared:
+            operation = "old * old"
+        elif rng.random() < 0.5:
+            operation = f"old * {rng.randint(2, 19)}"
+        else:
+            operation = f"old + {rng.randint(1, 8)}"
+        if_true, if_false = rng.sample([j for j in range(n_monkeys) if j != i], 2)
+        blocks.append(
+            f"Monkey {i}:\n"
+            f"  Starting items: {', '.join(map(str, items[i]))}\n"
+            f"  Operation: new = {operation}\n"
+            f"  Test: divisible by {divisors[i]}\n"
+            f"    If true: throw to monkey {if_true}\n"
+            f"    If false: throw to monkey {if_false}\n"
+        )
+    return "\n".join(blocks)
 
 
 def aoc_inputs():
     return {
         "example": ("day11-input-ex", 10605, 2713310158),
-        "real": ("day11-input-1", 62491, 8),
+        "real": ("day11-input-1", 62491, 17408399184),
+        # Routes repeating quickly, and routes too long to be followed
+        "generated-5000": ("day11-input-gen-5000", 1463191065, 459653058731476),
+        "generated-500": ("day11-input-gen-500", 12183318, 4615467748325),
     }
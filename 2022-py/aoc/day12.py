@@ -1,74 +1,66 @@
+import random
+
+from aoc import search
+
+
 def parse_input(raw: str):
-    level = {}
-    start, end = None, None
-    for i, line in enumerate(raw.splitlines()):
-        for j, c in enumerate(line):
-            height = ord(c)
-            if c == "S":
-                height = ord("a")
-                start = i, j
-            elif c == "E":
-                height = ord("z")
-                end = i, j
-            level[i, j] = height - ord("a")
-
-    return level, start, end
-
-
-def around(p):
-    px, py = p
-    yield px + 1, py
-    yield px - 1, py
-    yield px, py + 1
-    yield px, py - 1
+    import numpy as np
+
+    lines = raw.splitlines()
+    grid = np.array([list(line.encode()) for line in lines], dtype=np.int16)
+    start = int(np.flatnonzero(grid == ord("S"))[0])
+    end = int(np.flatnonzero(grid == ord("E"))[0])
+    grid.flat[start], grid.flat[end] = ord("a"), ord("z")
+    return grid - ord("a"), start, end
+
+
+def climb(level):
+    """
+    Moves allowed between the linear ids of two cells: one step up at most.
+    """
+    flat = level.ravel()
+    return lambda u, v: flat[v] - flat[u] <= 1
 
 
 def part_1(input):
+    import numpy as np
+
     level, start, end = input
-    to_explore = [start]
-    explored = set()
-    dist = 0
-    # BFS search
-    while True:
-        to_explore_next = set()
-        if not to_explore:
-            print("warning: no solution found...")
-            break
-        for node in to_explore:
-            explored.add(node)
-            if node == end:
-                return dist
-            for child in around(node):
-                if child not in explored and child in level:
-                    if level[child] - level[node] <= 1:
-                        to_explore_next.add(child)
-        to_explore = list(to_explore_next)
-        dist += 1
+    passable = np.ones(level.shape, dtype=bool)
+    dist = search.grid_bfs([start], passable, climb(level), target=end)
+    return int(dist.flat[end])
 
 
 def part_2(input):
+    import numpy as np
+
     level, start, end = input
-    to_explore = [end]
-    explored = {}
-    dist = 0
-    # BFS explore the full graph from the end
-    while True:
-        if not to_explore:
-            break
-        to_explore_next = set()
-        for node in to_explore:
-            explored[node] = dist
-            for child in around(node):
-                if child not in explored and child in level:
-                    # The condition is inverted compared to part 1!
-                    if level[node] - level[child] <= 1:
-                        to_explore_next.add(child)
-        to_explore = list(to_explore_next)
-        dist += 1
-    best = min(
-        [(k, v) for k, v in explored.items() if level[k] == 0], key=lambda x: x[1]
-    )
-    return best[1]
+    # Multi-source BFS from every lowest cell
+    sources = np.flatnonzero(level == 0)
+    passable = np.ones(level.shape, dtype=bool)
+    dist = search.grid_bfs(sources, passable, climb(level), target=end)
+    return int(dist.flat[end])
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    A ``scale`` x ``scale`` heightmap (at least 26 columns wide) climbing from
+    west to east. The middle row is a valid path from S to E.
+    """
+    rng = random.Random(seed)
+    height, width = max(scale, 1), max(scale, 26)
+    rows = []
+    for i in range(height):
+        row = []
+        for j in range(width):
+            h = j * 25 // (width - 1)
+            if i != height // 2:
+                h = max(h - rng.randint(0, 2), 0)
+            row.append(chr(ord("a") + h))
+        rows.append(row)
+    rows[height // 2][0] = "S"
+    rows[height // 2][-1] = "E"
+    return "\n".join("".join(row) for row in rows) + "\n"
 
 
 def aoc_inputs():
@@ -1,3 +1,4 @@
+import random
 from functools import cmp_to_key
 
 
@@ -63,6 +64,28 @@ def part_2(lst):
     return acc
 
 
+def random_packet(rng, depth=0):
+    packet = []
+    for _ in range(rng.randint(0, 4)):
+        if depth < 3 and rng.random() < 0.3:
+            packet.append(random_packet(rng, depth + 1))
+        else:
+            packet.append(rng.randint(0, 10))
+    return packet
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` pairs of packets.
+    """
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(scale):
+        left, right = random_packet(rng), random_packet(rng)
+        pairs.append(f"{left}\n{right}".replace(" ", ""))
+    return "\n\n".join(pairs) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day13-input-ex", 13, 140),
@@ -1,8 +1,9 @@
 # Skeleton for days
 import copy
+import random
 import re
 
-from aoc import SparseMap
+from aoc import SparseMap, clip
 
 COORDS_RE = re.compile(r"(\d+),(\d+)")
 
@@ -85,6 +86,26 @@ def part_2(input):
         i += 1
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    A cave ``scale`` units deep, with about ``scale / 4`` rock paths.
+    """
+    rng = random.Random(seed)
+    depth = max(scale, 2)
+    paths = []
+    for _ in range(max(depth // 4, 1)):
+        x, y = 500 + rng.randint(-depth, depth), rng.randint(1, depth)
+        points = [(x, y)]
+        for k in range(rng.randint(1, 3)):
+            if k % 2 == 0:
+                x += rng.choice([-1, 1]) * rng.randint(1, 8)
+            else:
+                y = clip(y + rng.choice([-1, 1]) * rng.randint(1, 8), 1, depth)
+            points.append((x, y))
+        paths.append(" -> ".join(f"{x},{y}" for x, y in points))
+    return "\n".join(paths) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day14-input-ex", 24, 93),
@@ -1,7 +1,6 @@
+import random
 import re
 
-from tqdm import tqdm, trange
-
 from aoc import SparseMap
 
 COORDS_RE = re.compile(r"x=(-?\d+), y=(-?\d+)")
@@ -129,6 +128,24 @@ def part_2(input):
     return m[x].as_long() * 4000000 + m[y].as_long()
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` sensors (never 14, which selects the example's target line),
+    around the line scanned by part 1 so that they all contribute to it.
+    """
+    rng = random.Random(seed)
+    n_sensors = scale if scale != 14 else 15
+    lines = []
+    for _ in range(n_sensors):
+        sx = rng.randint(0, 4000000)
+        sy = 2000000 + rng.randint(-2000, 2000)
+        r = rng.randint(100, 2000)
+        dx = rng.randint(-r, r)
+        bx, by = sx + dx, sy + rng.choice([-1, 1]) * (r - abs(dx))
+        lines.append(f"Sensor at x={sx}, y={sy}: closest beacon is at x={bx}, y={by}")
+    return "\n".join(lines) + "\n"
+
+
 def aoc_inputs():
     return {
         # "example": ("day15-input-ex", 26, 56000011),
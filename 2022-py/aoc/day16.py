@@ -1,9 +1,13 @@
+import itertools
+import random
 import re
+import string
+from typing import TYPE_CHECKING
 
-import networkx as nx
-import numpy as np
-from networkx import DiGraph
-from tqdm import trange
+from aoc.memo import memo
+
+if TYPE_CHECKING:
+    from networkx import DiGraph
 
 INPUT_RE = re.compile(
     r"Valve ([A-Z]+) has flow rate=(\d+); tunnels? leads? to valves? (.*)"
@@ -11,6 +15,8 @@ INPUT_RE = re.compile(
 
 
 def parse_input(raw: str):
+    from networkx import DiGraph
+
     g = DiGraph()
     for line in raw.splitlines():
         src, flow, dst = INPUT_RE.match(line).groups()
@@ -32,17 +38,14 @@ def clear_bit(x, n):
     return x & (0xFFFF_FFFF_FFFF_FFFF ^ (1 << n))
 
 
-def memo_solve_p1(cache, valves, dists, start, opened, clock):
-    key = start, opened, clock
-    v = cache.get(key)
-    if v is not None:
-        return cache[key]
-    r = solve_p1(cache, valves, dists, start, opened, clock)
-    cache[key] = r
-    return r
+def state_key(flow, dists, start, opened, clock):
+    # flow and dists are left out: solve_p1.cache_clear() must be called
+    # before solving another graph. Any clock <= 0 gives 0.
+    return (opened << 16 | start) << 8 | max(clock, 0)
 
 
-def solve_p1(cache, flow, dists, start, opened, clock):
+@memo(key=state_key)
+def solve_p1(flow, dists, start, opened, clock):
     if clock <= 0:
         return 0
     best = 0
@@ -51,25 +54,24 @@ def solve_p1(cache, flow, dists, start, opened, clock):
         if i == start:
             continue
         if not bit_is_set(opened_new, i):
-            x = memo_solve_p1(
-                cache, flow, dists, i, opened_new, clock - 1 - dists[start, i]
-            )
+            x = solve_p1(flow, dists, i, opened_new, clock - 1 - dists[start][i])
             if x > best:
                 best = x
     return clock * flow[start] + best
 
 
-def part_1(input: DiGraph):
+def part_1(input: "DiGraph"):
+    import networkx as nx
+
     distances = nx.floyd_warshall(input)
     valves = [("AA", 0)] + [
         (n, input.nodes[n]["flow"]) for n in input.nodes if input.nodes[n]["flow"] > 0
     ]
     valves_flow = [v[1] for v in valves]
-    valve_distances = np.array(
-        [[distances[i][j] for j, _ in valves] for i, _ in valves], dtype=np.int64
-    )
-    cache = {}
-    r = memo_solve_p1(cache, valves_flow, valve_distances, 0, 0, 30)
+    valve_distances = [[int(distances[i][j]) for j, _ in valves] for i, _ in valves]
+    # The cache is only valid for these valves, see state_key
+    solve_p1.cache_clear()
+    r = solve_p1(valves_flow, valve_distances, 0, 0, 30)
     return r
 
 
@@ -81,31 +83,66 @@ def _decode(x, n):
     return active
 
 
-def part_2(input: DiGraph):
+def part_2(input: "DiGraph"):
+    import networkx as nx
+    from tqdm import trange
+
     distances = nx.floyd_warshall(input)
     valves = [("AA", 0)] + [
         (n, input.nodes[n]["flow"]) for n in input.nodes if input.nodes[n]["flow"] > 0
     ]
     valves_flow = [v[1] for v in valves]
-    valve_distances = np.array(
-        [[distances[i][j] for j, _ in valves] for i, _ in valves], dtype=np.int64
-    )
+    valve_distances = [[int(distances[i][j]) for j, _ in valves] for i, _ in valves]
 
     results = []
 
     nodes = len(valves_flow) - 1
     mask = 2**nodes - 1 << 1
     print(f"number of nodes: {2 ** nodes}")
-    cache = {}
+    # The cache is only valid for these valves, see state_key
+    solve_p1.cache_clear()
     for i in trange(2**nodes):
         elephant = i << 1
         other = elephant ^ mask
-        s_1 = memo_solve_p1(cache, valves_flow, valve_distances, 0, elephant, 26)
-        s_2 = memo_solve_p1(cache, valves_flow, valve_distances, 0, other, 26)
+        s_1 = solve_p1(valves_flow, valve_distances, 0, elephant, 26)
+        s_2 = solve_p1(valves_flow, valve_distances, 0, other, 26)
         results.append(s_1 + s_2)
     return max(results)
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    A connected network of ``scale`` valves (at most 676), a quarter of which
+    have a positive flow rate. Part 2 is exponential in their number.
+    """
+    rng = random.Random(seed)
+    n_valves = min(max(scale, 2), 26 * 26)
+    names = ["".join(p) for p in itertools.product(string.ascii_uppercase, repeat=2)]
+    names.remove("AA")
+    names = ["AA"] + rng.sample(names, n_valves - 1)
+    tunnels = {name: set() for name in names}
+    # A random spanning tree, and a few more tunnels
+    edges = [(i, rng.randrange(i)) for i in range(1, n_valves)]
+    edges += [rng.sample(range(n_valves), 2) for _ in range(n_valves // 4)]
+    for i, j in edges:
+        tunnels[names[i]].add(names[j])
+        tunnels[names[j]].add(names[i])
+    flowing = set(rng.sample(names[1:], n_valves // 4))
+    lines = []
+    for name in names:
+        flow = rng.randint(1, 25) if name in flowing else 0
+        dst = sorted(tunnels[name])
+        if len(dst) == 1:
+            lines.append(
+                f"Valve {name} has flow rate={flow}; tunnel leads to valve {dst[0]}"
+            )
+        else:
+            lines.append(
+                f"Valve {name} has flow rate={flow}; tunnels lead to valves {', '.join(dst)}"
+            )
+    return "\n".join(lines) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day16-input-ex", 1651, 1707),
@@ -1,4 +1,10 @@
-from aoc import SparseMap
+import random
+from typing import TYPE_CHECKING
+
+from aoc import cycles, jit
+
+if TYPE_CHECKING:
+    from aoc.grid import Grid
 
 ROCK_PATTERNS = [
     [[1, 1, 1, 1]],
@@ -13,21 +19,53 @@ def parse_input(raw: str):
     return list(raw.strip())
 
 
-def collides(m, pattern, pattern_offset):
-    px, py = pattern_offset
-    if py <= 0:
-        return True
-    if px < 0 or px + len(pattern[0]) > 7:
-        return True
+def pattern_offsets(pattern):
+    """
+    Coordinates of the cells of a rock relative to its bottom left corner.
 
+    >>> pattern_offsets(ROCK_PATTERNS[2])
+    ((0, 0), (1, 0), (2, 0), (2, 1), (2, 2))
+    """
     h = len(pattern)
-    for i, row in enumerate(pattern):
-        for j, x in enumerate(row):
-            if pattern[h - i - 1][j] == 1 and m[px + j, py + i] == "#":
-                return True
+    return tuple(
+        (j, i)
+        for i in range(h)
+        for j in range(len(pattern[0]))
+        if pattern[h - i - 1][j]
+    )
+
+
+@jit.kernel
+def collides(cells, ox, oy, offsets, width, px, py):
+    """
+    Whether a rock at ``(px, py)`` overlaps the floor, the walls or the rocks
+    of ``cells``, the cells of a ``Grid`` whose origin is ``(ox, oy)``.
+    """
+    if py <= 0 or px < 0 or px + width > 7:
+        return True
+    for dx, dy in offsets:
+        i = px + dx - ox
+        j = py + dy - oy
+        if 0 <= i < cells.shape[0] and 0 <= j < cells.shape[1] and cells[i, j] == 35:
+            return True
     return False
 
 
+@jit.kernel
+def drop_rock(cells, ox, oy, offsets, width, jets, jet_id, px, py):
+    """
+    Push and drop a rock from ``(px, py)`` until it rests, returns where it
+    rests and the next jet. ``jets`` are the horizontal moves, -1 or 1.
+    """
+    while True:
+        if not collides(cells, ox, oy, offsets, width, px + jets[jet_id], py):
+            px += jets[jet_id]
+        jet_id = (jet_id + 1) % len(jets)
+        if collides(cells, ox, oy, offsets, width, px, py - 1):
+            return px, py, jet_id
+        py -= 1
+
+
 def save_pattern(m, pattern, pattern_offset):
     px, py = pattern_offset
     h = len(pattern)
@@ -38,76 +76,58 @@ def save_pattern(m, pattern, pattern_offset):
                 m[px + j, py + i] = "#"
 
 
-def set_bit(x, n):
-    return x | (1 << n)
-
-
-def build_state(m, y_max):
-    state = 0
-    covered = 0
-    w = 4
-    for i in range(7):
-        for j in range(w):
-            if m[i, y_max - j] == "#":
-                state = set_bit(state, i * w + j)
-                covered = set_bit(covered, i)
-    return state, covered
-
-
 class RockSimulator:
-    def __init__(self, m: SparseMap, jet_patterns):
+    def __init__(self, m: "Grid", jet_patterns):
+        import numpy as np
+
         self.m = m
         self.rock_id = 0
         self.jet_id = 0
         self.jet_patterns = jet_patterns
+        self.jets = np.array([1 if c == ">" else -1 for c in jet_patterns])
+        self.offsets = [pattern_offsets(p) for p in ROCK_PATTERNS]
         self.rock_spawned = 0
 
     def spawn_rock(self):
         _, (y_min, y_max) = self.m.limits()
-        loc = 2, y_max + 4
         rock_pattern = ROCK_PATTERNS[self.rock_id]
-        while True:
-            sh_dir = self.jet_patterns[self.jet_id]
-            self.jet_id = (self.jet_id + 1) % len(self.jet_patterns)
-            if sh_dir == ">" and not collides(
-                self.m, rock_pattern, (loc[0] + 1, loc[1])
-            ):
-                loc = loc[0] + 1, loc[1]
-            elif sh_dir == "<" and not collides(
-                self.m, rock_pattern, (loc[0] - 1, loc[1])
-            ):
-                loc = loc[0] - 1, loc[1]
-            new_loc = loc[0], loc[1] - 1
-            if collides(self.m, rock_pattern, new_loc):
-                save_pattern(self.m, rock_pattern, loc)
-                self.rock_id = (self.rock_id + 1) % len(ROCK_PATTERNS)
-                self.rock_spawned += 1
-                break
-            else:
-                loc = new_loc
+        (ox, oy), offsets = self.m.origin, self.offsets[self.rock_id]
+        px, py, self.jet_id = drop_rock(
+            self.m.cells,
+            ox,
+            oy,
+            offsets,
+            len(rock_pattern[0]),
+            self.jets,
+            self.jet_id,
+            2,
+            y_max + 4,
+        )
+        save_pattern(self.m, rock_pattern, (px, py))
+        self.rock_id = (self.rock_id + 1) % len(ROCK_PATTERNS)
+        self.rock_spawned += 1
 
     def jet_id_relative(self):
         return self.jet_id % len(self.jet_patterns)
 
-    def loop_until_period(self):
-        history = {}
-        while True:
-            y_max_current = self.y_max()
-            state, covered = build_state(self.m, y_max_current)
-            if covered == 127:
-                key = state, self.jet_id_relative(), self.rock_id
-                if key in history:
-                    step_old, y_max_old = history[key]
-                    return step_old, self.rock_spawned, y_max_old, y_max_current
-                history[key] = self.rock_spawned, y_max_current
-            self.spawn_rock()
+    def surface_key(self, depth=32):
+        """
+        The state of the simulation, up to what is buried more than
+        ``depth`` rows under the top of the tower.
+        """
+        y_max = self.y_max()
+        (ox, oy), cells = self.m.origin, self.m.cells
+        top = cells[-ox : 7 - ox, max(y_max - depth + 1 - oy, 0) : y_max + 1 - oy]
+        return self.rock_id, self.jet_id_relative(), (top == 35).tobytes()
 
     def y_max(self):
         return self.m.limits()[1][1]
 
 
 def part_1(aoc_input):
-    simulator = RockSimulator(SparseMap({}, default="."), aoc_input)
+    from aoc import Grid
+
+    simulator = RockSimulator(Grid({}, default="."), aoc_input)
     for i in range(2022):
         simulator.spawn_rock()
     assert simulator.rock_spawned == 2022
@@ -118,18 +138,27 @@ def part_2(aoc_input):
     # target = 2022
     target = 1000000000000
 
-    simulator = RockSimulator(SparseMap({}, default="."), aoc_input)
-    step_old, step, y_old, y_new = simulator.loop_until_period()
+    from aoc import Grid
+
+    simulator = RockSimulator(Grid({}, default="."), aoc_input)
+    heights = []
+
+    def surface_keys():
+        while True:
+            heights.append(simulator.y_max())
+            yield simulator.surface_key()
+            simulator.spawn_rock()
+
+    mu, lam = cycles.detect(surface_keys())
+    return cycles.extrapolate(target, mu, lam, heights.__getitem__)
 
-    delta = step - step_old
-    delta_y = y_new - y_old
-    height = y_old + ((target - step_old) // delta) * delta_y
-    remaining = (target - step_old) % delta
-    for i in range(remaining):
-        simulator.spawn_rock()
-    y_extra = simulator.y_max()
 
-    return height + y_extra - y_new
+def generate(scale: int, seed=0) -> str:
+    """
+    A jet pattern of ``scale`` pushes.
+    """
+    rng = random.Random(seed)
+    return "".join(rng.choices("<>", k=max(scale, 1))) + "\n"
 
 
 def aoc_inputs():
@@ -1,3 +1,8 @@
+import random
+
+from aoc import search
+
+
 def parse_input(raw: str):
     cubes = [tuple(map(int, l.split(","))) for l in raw.splitlines()]
     return {c: "#" for c in cubes}
@@ -46,29 +51,6 @@ def in_bounds(bounds, coords):
     return True
 
 
-def spread_air(world, air_bubbles, bounds, src):
-    to_explore = {src}
-    explored = set()
-    cur = set()
-    while len(to_explore) > 0:
-        # if to_explore == ""
-        p = to_explore.pop()
-        if not in_bounds(bounds, p):
-            # We reached the outer boundaries. This is not
-            # a closed area.
-            return
-        explored.add(p)
-        if p not in world:
-            cur.add(p)
-        for p_next in around(p):
-            if p_next in explored or p_next in world:
-                continue
-            to_explore.add(p_next)
-
-    for c in cur:
-        air_bubbles.add(c)
-
-
 def viz(world, air_bubbles):
     """
     Funny 3D visualization.
@@ -93,15 +75,21 @@ def viz(world, air_bubbles):
 
 
 def part_2(world):
-    bounds = limits(world, margin=0)
-    poi = set()
+    import numpy as np
+
+    # The box around the cubes, with a layer of air all around: the outside
+    # air is what a BFS from one of its corners reaches.
+    bounds = limits(world, margin=1)
+    origin = [lo for lo, _ in bounds]
+    shape = tuple(hi - lo + 1 for lo, hi in bounds)
+    air = np.ones(shape, dtype=bool)
     for c in world:
-        for c_next in around(c):
-            if c_next not in world and in_bounds(bounds, c_next):
-                poi.add(c_next)
-    air_bubbles = set()
-    for c in poi:
-        spread_air(world, air_bubbles, bounds, c)
+        air[tuple(v - o for v, o in zip(c, origin))] = False
+    outside = search.grid_bfs([0], air) != search.UNREACHED
+    air_bubbles = {
+        tuple(int(v + o) for v, o in zip(c, origin))
+        for c in np.argwhere(air & ~outside)
+    }
 
     # Sanity checks:
     assert len(air_bubbles.intersection(set(world.keys()))) == 0
@@ -113,6 +101,19 @@ def part_2(world):
     return visible_edges(world, air_bubbles)
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` cubes filling about half of a box, which leaves air pockets.
+    """
+    rng = random.Random(seed)
+    side = max(round((2 * scale) ** (1 / 3)), 2)
+    n_cubes = min(max(scale, 1), side**3)
+    cubes = []
+    for c in rng.sample(range(side**3), n_cubes):
+        cubes.append(f"{c % side},{c // side % side},{c // side**2}")
+    return "\n".join(cubes) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day18-input-ex", 64, 58),
@@ -1,8 +1,8 @@
+import random
 import re
-from dataclasses import dataclass, field
-from typing import Any
+from dataclasses import dataclass
 
-import numpy as np
+from aoc.memo import memo
 
 LINE_RE = re.compile(
     r"Blueprint (\d+): Each ore robot costs (\d+) ore. Each clay robot costs (\d+) ore. Each obsidian robot costs (\d+) ore and (\d+) clay. Each geode robot costs (\d+) ore and (\d+) obsidian."
@@ -10,6 +10,8 @@ LINE_RE = re.compile(
 
 
 def parse_input(raw: str):
+    import numpy as np
+
     costs = []
     for line in raw.splitlines():
         cost_matrix = np.zeros((4, 4), dtype=np.int64)
@@ -90,9 +92,8 @@ def sanity_check():
 
 @dataclass
 class Ctx:
-    costs: np.ndarray
-    max_needed: np.ndarray
-    cache: Any = field(default_factory=dict)
+    costs: list
+    max_needed: list
 
 
 def next_configs(ctx, minerals, bots, remaining):
@@ -121,34 +122,33 @@ def next_configs(ctx, minerals, bots, remaining):
     yield minerals_without_bots, bots, remaining
 
 
-def memo_optimal_prod(ctx: Ctx, minerals, bots, duration):
-    key = minerals, bots, duration
-    v = ctx.cache.get(key)
-    if v is not None:
-        return v
-    r = optimal_prod(ctx, minerals, bots, duration)
-    if len(ctx.cache) > 4e6:
-        import itertools
-
-        to_remove = list(itertools.islice(ctx.cache.keys(), 0, 1000 * 1000))
-        for k in to_remove:
-            del ctx.cache[k]
-
-    ctx.cache[key] = r
-    return r
+def state_key(ctx, minerals, bots, duration):
+    # pack((*minerals, *bots, duration), 16), inlined as it runs on every
+    # call. ctx is left out: optimal_prod.cache_clear() must be called before
+    # solving another blueprint.
+    m0, m1, m2, m3 = minerals
+    b0, b1, b2, b3 = bots
+    k = ((m0 << 16 | m1) << 16 | m2) << 16 | m3
+    k = (((k << 16 | b0) << 16 | b1) << 16 | b2) << 16 | b3
+    return k << 16 | duration
 
 
+# Bounds the memory of part 2, whose states do not all fit: an entry costs
+# about 250 bytes of RSS, evicted keys included
+@memo(key=state_key, maxsize=1_000_000, policy="clock")
 def optimal_prod(ctx: Ctx, minerals, bots, duration):
     if duration <= 0:
         return minerals[3]
     best = 0
     for m_new, b_new, delta in next_configs(ctx, minerals, bots, duration):
         # TODO: shrink minerals
-        best = max(best, memo_optimal_prod(ctx, m_new, b_new, duration - delta))
+        best = max(best, optimal_prod(ctx, m_new, b_new, duration - delta))
     return best
 
 
 def part_1(costs):
+    import numpy as np
+
     # return 1389
     sanity_check()
     r_init = (1, 0, 0, 0)
@@ -158,8 +158,10 @@ def part_1(costs):
     scores = []
     for i in range(len(costs)):
         c = costs[i]
-        ctx = Ctx(costs=c, max_needed=np.max(c, axis=0), cache={})
-        r = memo_optimal_prod(ctx, s_init, r_init, 24)
+        ctx = Ctx(costs=c.tolist(), max_needed=np.max(c, axis=0).tolist())
+        # The cache is only valid for this blueprint, see state_key
+        optimal_prod.cache_clear()
+        r = optimal_prod(ctx, s_init, r_init, 24)
         scores.append(r)
         print(r)
         quality_level += (i + 1) * r
@@ -168,18 +170,41 @@ def part_1(costs):
 
 
 def part_2(costs):
+    import numpy as np
+
     r_init = (1, 0, 0, 0)
     s_init = (0, 0, 0, 0)
     xs = []
     for i in range(0, 3):
         c = costs[i]
-        ctx = Ctx(costs=c, max_needed=np.max(c, axis=0), cache={})
-        r = memo_optimal_prod(ctx, s_init, r_init, 32)
+        ctx = Ctx(costs=c.tolist(), max_needed=np.max(c, axis=0).tolist())
+        # The cache is only valid for this blueprint, see state_key
+        optimal_prod.cache_clear()
+        r = optimal_prod(ctx, s_init, r_init, 32)
         print(r)
         xs.append(r)
     return xs[0] * xs[1] * xs[2]
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` blueprints (at least the 3 used by part 2).
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(max(scale, 3)):
+        lines.append(
+            f"Blueprint {i + 1}: "
+            f"Each ore robot costs {rng.randint(2, 4)} ore. "
+            f"Each clay robot costs {rng.randint(2, 4)} ore. "
+            f"Each obsidian robot costs {rng.randint(2, 4)} ore "
+            f"and {rng.randint(5, 20)} clay. "
+            f"Each geode robot costs {rng.randint(2, 4)} ore "
+            f"and {rng.randint(5, 20)} obsidian."
+        )
+    return "\n".join(lines) + "\n"
+
+
 def aoc_inputs():
     return {
         # "example": ("day19-input-ex", 33, 8),
@@ -1,3 +1,6 @@
+import random
+
+
 POINTS = {"A": 1, "B": 2, "C": 3}  # rock, paper, chisel
 RENAME = {"X": "A", "Y": "B", "Z": "C"}
 WIN_AGAINST = {"A": "C", "C": "B", "B": "A"}
@@ -36,6 +39,15 @@ def part_2(input):
     return sum([outcome(find_choice(x, y), x) for x, y in input])
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    A strategy guide of ``scale`` rounds.
+    """
+    rng = random.Random(seed)
+    rounds = [f"{rng.choice('ABC')} {rng.choice('XYZ')}" for _ in range(scale)]
+    return "\n".join(rounds) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day2-input-ex", 15, 12),
@@ -1,5 +1,6 @@
-import numpy as np
-from tqdm import trange
+import random
+
+from aoc import jit
 
 
 def parse_input(raw: str):
@@ -26,6 +27,7 @@ def dump(d, start, direction=2):
     return ", ".join(f"{x}" for x in r)
 
 
+@jit.kernel
 def cmod(x, m):
     """
     Modulo, with C-like behavior.
@@ -33,6 +35,7 @@ def cmod(x, m):
     return x - int(x / m) * m
 
 
+@jit.kernel
 def mix_round(d):
     # z_index = np.argwhere(d[:, 0] == 0).flatten()[0]
     for offset in range(len(d)):
@@ -63,6 +66,8 @@ def mix_round(d):
 
 
 def part_1(seq):
+    import numpy as np
+
     d = np.zeros((len(seq), 3), dtype=np.int32)
     for i, v in enumerate(seq):
         d[i] = [v, (i - 1) % len(seq), (i + 1) % len(seq)]
@@ -74,6 +79,9 @@ def part_1(seq):
 
 
 def part_2(seq):
+    import numpy as np
+    from tqdm import trange
+
     d = np.zeros((len(seq), 3), dtype=np.int64)
     for i, v in enumerate(seq):
         d[i] = [811589153 * v, (i - 1) % len(seq), (i + 1) % len(seq)]
@@ -84,6 +92,18 @@ def part_2(seq):
     return sum(grooves_coordinates)
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    An encrypted file of ``scale`` numbers, a single one of which is 0.
+    """
+    rng = random.Random(seed)
+    numbers = [
+        rng.choice([-1, 1]) * rng.randint(1, 10000) for _ in range(max(scale, 1))
+    ]
+    numbers[rng.randrange(len(numbers))] = 0
+    return "\n".join(map(str, numbers)) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day20-input-ex", 3, 1623178306),
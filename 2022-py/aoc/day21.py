@@ -1,10 +1,12 @@
 import copy
+import operator
+import random
 import re
-
-from z3 import Solver, Real
+import string
 
 DEF_RE = re.compile(r"(\w+): (\d+)")
 MATH_RE = re.compile(r"(\w+): (\w+) ([+*/-]) (\w+)")
+OPS = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.floordiv}
 
 
 def parse_input(raw: str):
@@ -71,6 +73,8 @@ def make_symbolic(ctx, target):
 
 
 def part_2(ctx):
+    from z3 import Solver, Real
+
     humn = Real("x")
     ctx["humn"] = humn
     l, _, r = ctx["root"]
@@ -84,6 +88,62 @@ def part_2(ctx):
     return m[humn].as_long()
 
 
+def random_monkeys(rng, n, monkeys, humn=None):
+    """
+    Add a random tree of ``n`` monkeys to ``monkeys``, with ``humn`` yelling
+    ``humn`` if it is not None. Returns the name and the number of its root.
+
+    Divisions are exact, and ``humn`` is never multiplied by 0 nor used as a
+    divisor, so that part 2 has a single integer solution.
+    """
+    if n < 3:
+        if humn is not None:
+            monkeys["humn"] = str(humn)
+            return "humn", humn
+        value = rng.randint(1, 20)
+        name = new_monkey(rng, monkeys, str(value))
+        return name, value
+
+    k = rng.randint(1, n - 2)
+    humn_left = rng.random() < 0.5
+    a, x_1 = random_monkeys(rng, k, monkeys, humn if humn_left else None)
+    b, x_2 = random_monkeys(rng, n - 1 - k, monkeys, None if humn_left else humn)
+    ops = ["+", "-"]
+    if x_1 * x_2 != 0 and abs(x_1 * x_2) < 10**12:
+        ops.append("*")
+    if (humn is None or humn_left) and x_2 != 0 and x_1 % x_2 == 0:
+        ops.append("/")
+    op = rng.choice(ops)
+    value = OPS[op](x_1, x_2)
+    return new_monkey(rng, monkeys, f"{a} {op} {b}"), value
+
+
+def new_monkey(rng, monkeys, job):
+    while True:
+        name = "".join(rng.choices(string.ascii_lowercase, k=4))
+        if name not in monkeys and name not in ("root", "humn"):
+            monkeys[name] = job
+            return name
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    About ``scale`` monkeys forming a random expression tree, ``humn`` being
+    the solution of part 2.
+    """
+    rng = random.Random(seed)
+    monkeys = {}
+    n_left = max((scale - 3) // 2, 1)
+    left, target = random_monkeys(rng, n_left, monkeys, rng.randint(1, 5000))
+    right, value = random_monkeys(rng, max(scale - 3 - n_left, 1), monkeys)
+    # Balance the root
+    delta = new_monkey(rng, monkeys, str(abs(target - value)))
+    op = "+" if target >= value else "-"
+    balanced = new_monkey(rng, monkeys, f"{right} {op} {delta}")
+    monkeys["root"] = f"{left} + {balanced}"
+    return "".join(f"{name}: {job}\n" for name, job in monkeys.items())
+
+
 def aoc_inputs():
     return {
         "example": ("day21-input-ex", 152, 301),
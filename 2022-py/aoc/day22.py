@@ -1,7 +1,9 @@
 # Skeleton for days
+import random
 import re
 
 import aoc
+from aoc import search
 
 STEP_RE = re.compile(r"(\d+|[LR])")
 
@@ -120,20 +122,24 @@ def part_1(args):
 
 
 def scan_squares(m, start, width):
-    dirs = [(-width, 0), (width, 0), (0, width), (0, -width)]
-    to_explore = {start}
+    """
+    Number the squares of side ``width`` of the map from 1, in the order of
+    a BFS from the square at ``start``. Returns their origins.
+    """
+    import numpy as np
+
+    shape = tuple(max(p[k] for p in m) // width + 1 for k in (0, 1))
+    squares = np.zeros(shape, dtype=bool)
+    for i, j in np.ndindex(shape):
+        squares[i, j] = (i * width, j * width) in m
+    neighbors = search.grid_neighbors(shape, passable=squares)
+    source = np.ravel_multi_index((start[0] // width, start[1] // width), shape)
     explored = {}
-    s_id = 1
-    while len(to_explore) > 0:
-        head = to_explore.pop()
-        explored[head] = s_id
-        s_id += 1
-        for d in adjacent(head, dirs):
-            if d in explored:
-                continue
-            if d not in m:
-                continue
-            to_explore.add(d)
+    for s_id, (u, _) in enumerate(
+        search.bfs_order([source], neighbors, squares.size), 1
+    ):
+        i, j = np.unravel_index(u, shape)
+        explored[int(i) * width, int(j) * width] = s_id
     return explored
 
 
@@ -184,33 +190,33 @@ def part_2(args):
             cube = squares_origins[5]
             return (cube[0], cube[1] + delta[0]), (1, 0)
         if debug[src] == 2 and dir == (0, 1):
-            cube = squares_origins[4]
-            return (cube[0] + square_width - 1, cube[1] + delta[0]), (-1, 0)
-        if debug[src] == 4 and dir == (0, 1):
             cube = squares_origins[3]
+            return (cube[0] + square_width - 1, cube[1] + delta[0]), (-1, 0)
+        if debug[src] == 3 and dir == (0, 1):
+            cube = squares_origins[4]
             return (
                 cube[0] + square_width - 1 - delta[0],
                 cube[1] + square_width - 1,
             ), (0, -1)
         if debug[src] == 6 and dir == (1, 0):
-            cube = squares_origins[4]
+            cube = squares_origins[3]
             return (cube[0], cube[1] + delta[1]), (1, 0)
         if debug[src] == 6 and dir == (0, 1):
-            cube = squares_origins[3]
+            cube = squares_origins[4]
             return (cube[0] + square_width - 1, cube[1] + delta[0]), (-1, 0)
-        if debug[src] == 4 and dir == (1, 0):
+        if debug[src] == 3 and dir == (1, 0):
             cube = squares_origins[2]
             return (cube[0] + delta[1], cube[1] + square_width - 1), (0, -1)
-        if debug[src] == 3 and dir == (1, 0):
+        if debug[src] == 4 and dir == (1, 0):
             cube = squares_origins[6]
             return (cube[0] + delta[1], cube[1] + square_width - 1), (0, -1)
-        if debug[src] == 3 and dir == (0, 1):
-            cube = squares_origins[4]
+        if debug[src] == 4 and dir == (0, 1):
+            cube = squares_origins[3]
             return (
                 cube[0] + square_width - 1 - delta[0],
                 cube[1] + square_width - 1,
             ), (0, -1)
-        if debug[src] == 4 and dir == (-1, 0):
+        if debug[src] == 3 and dir == (-1, 0):
             cube = squares_origins[6]
             return (cube[0] + square_width - 1, cube[1] + delta[1]), (-1, 0)
         raise NotImplemented()
@@ -220,6 +226,29 @@ def part_2(args):
     return get_password(cursor, direction)
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    A path of ``scale`` instructions, on a board folding into a cube of side
+    50 like the real inputs, which part 2 is written for.
+    """
+    rng = random.Random(seed)
+    # Column ranges of each band of 50 rows
+    bands = [(50, 150), (50, 100), (0, 100), (0, 50)]
+    rows = []
+    for lo, hi in bands:
+        for _ in range(50):
+            tiles = rng.choices(".#", weights=[9, 1], k=hi - lo)
+            rows.append(" " * lo + "".join(tiles))
+    # The starting tile must be open
+    rows[0] = rows[0][:50] + "." + rows[0][51:]
+    path = []
+    for i in range(max(scale, 1)):
+        path.append(str(rng.randint(1, 50)))
+        if i != max(scale, 1) - 1:
+            path.append(rng.choice("LR"))
+    return "\n".join(rows) + "\n\n" + "".join(path) + "\n"
+
+
 def aoc_inputs():
     return {
         "real": ("day22-input-1", 164014, 47525),
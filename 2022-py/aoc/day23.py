@@ -1,7 +1,8 @@
 import collections
 import itertools
+import random
 
-from aoc import SparseMap
+from aoc import SparseMap, jit
 
 
 def parse_input(raw: str):
@@ -44,7 +45,83 @@ def tuple_add(p, q):
     return tuple(x + y for x, y in zip(p, q))
 
 
+@jit.kernel
+def elves_round(cells, proposals, counts, first_dir):
+    """
+    Play a round on ``cells`` (1 for an elf, its border must be empty),
+    considering the directions N, S, W, E from ``first_dir``. Returns the
+    number of elves which moved. ``proposals`` and ``counts`` are scratch
+    arrays of the shape of ``cells``.
+    """
+    h, w = cells.shape
+    counts[:] = 0
+    proposals[:] = -1
+    for i in range(1, h - 1):
+        for j in range(1, w - 1):
+            if cells[i, j] == 0:
+                continue
+            n = cells[i - 1, j - 1] + cells[i - 1, j] + cells[i - 1, j + 1]
+            s = cells[i + 1, j - 1] + cells[i + 1, j] + cells[i + 1, j + 1]
+            w_ = cells[i - 1, j - 1] + cells[i, j - 1] + cells[i + 1, j - 1]
+            e = cells[i - 1, j + 1] + cells[i, j + 1] + cells[i + 1, j + 1]
+            if n + s + cells[i, j - 1] + cells[i, j + 1] == 0:
+                continue
+            for k in range(4):
+                d = (first_dir + k) % 4
+                if (d == 0 and n == 0) or (d == 1 and s == 0):
+                    proposals[i, j] = d
+                    counts[i - 1 if d == 0 else i + 1, j] += 1
+                    break
+                if (d == 2 and w_ == 0) or (d == 3 and e == 0):
+                    proposals[i, j] = d
+                    counts[i, j - 1 if d == 2 else j + 1] += 1
+                    break
+    moved = 0
+    for i in range(1, h - 1):
+        for j in range(1, w - 1):
+            d = proposals[i, j]
+            if d < 0:
+                continue
+            ti = i - 1 if d == 0 else i + 1 if d == 1 else i
+            tj = j - 1 if d == 2 else j + 1 if d == 3 else j
+            if counts[ti, tj] == 1:
+                cells[i, j] = 0
+                cells[ti, tj] = 1
+                moved += 1
+    return moved
+
+
+def play_rounds(args, max_rounds):
+    """
+    Play rounds with ``elves_round`` until no elf moves, at most
+    ``max_rounds``. Returns the elves and the number of rounds played.
+    """
+    import numpy as np
+
+    keys = np.array(list(args.keys()))
+    origin = keys.min(axis=0)
+    cells = np.zeros(tuple(keys.max(axis=0) - origin + 1), dtype=np.uint8)
+    cells[tuple((keys - origin).T)] = 1
+    for round in range(max_rounds):
+        # Elves move by one cell per round at most
+        if round == 0 or cells[[0, -1]].any() or cells[:, [0, -1]].any():
+            cells = np.pad(cells, 16)
+            proposals = np.empty(cells.shape, dtype=np.int8)
+            counts = np.empty(cells.shape, dtype=np.int32)
+        if elves_round(cells, proposals, counts, round % 4) == 0:
+            return cells, round + 1
+    return cells, max_rounds
+
+
 def part_1(args):
+    if jit.enabled():
+        import numpy as np
+
+        cells, _ = play_rounds(args, 10)
+        xs, ys = np.nonzero(cells)
+        area = (xs.max() - xs.min() + 1) * (ys.max() - ys.min() + 1)
+        return int(area - len(xs))
+
     choices = [
         (DIRS["N"], DIRS["NE"], DIRS["NW"]),
         (DIRS["S"], DIRS["SE"], DIRS["SW"]),
@@ -100,6 +177,10 @@ def update_round(m, choices):
 
 
 def part_2(args):
+    if jit.enabled():
+        _, rounds = play_rounds(args, 2**31)
+        return rounds
+
     choices = [
         (DIRS["N"], DIRS["NE"], DIRS["NW"]),
         (DIRS["S"], DIRS["SE"], DIRS["SW"]),
@@ -117,6 +198,15 @@ def part_2(args):
         round += 1
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    A ``scale`` x ``scale`` grove, half of which is occupied by elves.
+    """
+    rng = random.Random(seed)
+    rows = ["".join(rng.choices(".#", k=scale)) for _ in range(scale)]
+    return "\n".join(rows) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day23-input-ex-2", 110, 20),
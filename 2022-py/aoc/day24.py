@@ -1,26 +1,10 @@
 # Skeleton for days
-import collections
-import copy
-import itertools
+import random
 from dataclasses import dataclass
 from typing import Any
 
 import aoc
-
-DIRS = {"<": (0, -1), ">": (0, 1), "^": (-1, 0), "v": (1, 0)}
-
-
-def adjacent(x, dirs):
-    for dx, dy in dirs:
-        yield x[0] + dx, x[1] + dy
-
-
-def tuple_add(p, q):
-    return tuple(x + y for x, y in zip(p, q))
-
-
-def tuple_mul(p, q):
-    return tuple(x * y for x, y in zip(p, q))
+from aoc import jit, search
 
 
 def tuple_reverse(x):
@@ -30,7 +14,6 @@ def tuple_reverse(x):
 @dataclass
 class Context:
     data: Any
-    busy_cells: Any
     blizzards: Any
     shape: Any
 
@@ -48,63 +31,143 @@ def parse_input(raw: str):
                 data[i, j] = c
     return Context(
         data=data,
-        busy_cells=set((i, j) for (i, j), _ in blizzards),
         blizzards=blizzards,
         shape=(len(lines), len(lines[0])),
     )
 
 
-def update_blizzards(ctx: Context):
-    busy = collections.defaultdict(int)
-    new_blizzards = []
-    for (i, j), d in ctx.blizzards:
-        move_dir = DIRS[d]
-        ni, nj = tuple_add((i, j), move_dir)
-        # Wrapping rules...
-
-        v = ctx.data.get((ni, nj), None)
-        if v is None or v == "#":
-            sh = tuple_mul(move_dir, (-(ctx.shape[0] + 1), -(ctx.shape[1] + 1)))
-            start = tuple_add((ni, nj), sh)
-            while ctx.data.get(start, None) != ".":
-                start = tuple_add(start, move_dir)
-            ni, nj = start
-        busy[(ni, nj)] += 1
-        new_blizzards.append(((ni, nj), d))
-    ctx.blizzards = new_blizzards
-    ctx.busy_cells = busy
-
-
 def part_1(ctx: Context):
-    ctx = copy.deepcopy(ctx)
     start = (0, 1)
     end = (ctx.shape[0] - 1, ctx.shape[1] - 2)
     assert ctx.data[start] == "."
     assert ctx.data[end] == "."
 
-    found = move_to(ctx, end, start)
-    return found
+    return walk_trips(ctx, [(start, end)])[0]
 
 
-def move_to(ctx, target, src):
-    locs = {src}
-    found = None
-    # my_loc = start
-    for i in range(10000):
-        update_blizzards(ctx)
-        if target in locs:
-            found = i
-            break
-        new_locs = set()
-        for head in locs:
-            for head_new in itertools.chain(adjacent(head, DIRS.values()), [head]):
-                if head_new in ctx.busy_cells:
+def valley_arrays(ctx: Context):
+    """
+    Walls of the valley, and the initial blizzards of its inside going in
+    each direction of ``BLIZZARD_DIRS``.
+    """
+    import numpy as np
+
+    h, w = ctx.shape
+    walls = np.ones((h, w), dtype=np.uint8)
+    for (i, j), c in ctx.data.items():
+        walls[i, j] = c != "."
+    blizzards = np.zeros((4, h - 2, w - 2), dtype=np.uint8)
+    for (i, j), d in ctx.blizzards:
+        blizzards[BLIZZARD_DIRS.index(d), i - 1, j - 1] = 1
+    return walls, blizzards
+
+
+BLIZZARD_DIRS = "><v^"
+
+
+@jit.kernel
+def blizzard_walk(walls, blizzards, t0, src, target, max_steps, locs, new_locs):
+    """
+    ``move_to`` as loops over the cells: the blizzards at time t are looked
+    up from their initial position, wrapping around the inside of the
+    valley. ``locs`` and ``new_locs`` are scratch arrays of the shape of
+    ``walls``.
+    """
+    h, w = walls.shape
+    bh, bw = h - 2, w - 2
+    locs[:] = 0
+    locs[src[0], src[1]] = 1
+    for k in range(max_steps):
+        if locs[target[0], target[1]]:
+            return k
+        t = t0 + k + 1
+        new_locs[:] = 0
+        for i in range(h):
+            for j in range(w):
+                if walls[i, j]:
                     continue
-                if ctx.data.get(head_new, None) != ".":
+                if not (
+                    locs[i, j]
+                    or (i > 0 and locs[i - 1, j])
+                    or (i < h - 1 and locs[i + 1, j])
+                    or (j > 0 and locs[i, j - 1])
+                    or (j < w - 1 and locs[i, j + 1])
+                ):
                     continue
-                new_locs.add(head_new)
-        locs = new_locs
-    return found
+                if 0 < i <= bh and 0 < j <= bw:
+                    bi, bj = i - 1, j - 1
+                    if (
+                        blizzards[0, bi, (bj - t) % bw]
+                        or blizzards[1, bi, (bj + t) % bw]
+                        or blizzards[2, (bi - t) % bh, bj]
+                        or blizzards[3, (bi + t) % bh, bj]
+                    ):
+                        continue
+                new_locs[i, j] = 1
+        locs, new_locs = new_locs, locs
+    return -1
+
+
+def blizzards_at(blizzards, t):
+    """
+    Cells of the inside of the valley with a blizzard at time ``t``.
+    """
+    import numpy as np
+
+    right, left, down, up = blizzards.astype(bool)
+    return (
+        np.roll(right, t, axis=1)
+        | np.roll(left, -t, axis=1)
+        | np.roll(down, t, axis=0)
+        | np.roll(up, -t, axis=0)
+    )
+
+
+def move_to(walls, blizzards, t0, src, target, max_steps):
+    """
+    Minimum number of steps from ``src`` to ``target`` starting at time
+    ``t0``, -1 if not reached in ``max_steps``: a BFS whose frontier is
+    spread over the cells free at each time.
+    """
+    import numpy as np
+
+    free = walls == 0
+    locs = np.zeros(walls.shape, dtype=bool)
+    locs[src] = True
+    for k in range(max_steps):
+        if locs[target]:
+            return k
+        free[1:-1, 1:-1] = ~blizzards_at(blizzards, t0 + k + 1)
+        locs = search.grid_spread(locs) & free
+    return -1
+
+
+def walk_trips(ctx: Context, trips, max_steps=10000):
+    """
+    Durations of the successive ``move_to`` of ``trips``, with the
+    ``blizzard_walk`` kernel when the JIT is enabled. The last one is None
+    if a trip takes more than ``max_steps``.
+    """
+    import numpy as np
+
+    walls, blizzards = valley_arrays(ctx)
+    locs, new_locs = np.empty_like(walls), np.empty_like(walls)
+    t = 0
+    durations = []
+    for src, target in trips:
+        if jit.enabled():
+            found = blizzard_walk(
+                walls, blizzards, t, src, target, max_steps, locs, new_locs
+            )
+        else:
+            found = move_to(walls, blizzards, t, src, target, max_steps)
+        if found < 0:
+            durations.append(None)
+            break
+        durations.append(found)
+        # The blizzards move once more as the target is reached
+        t += found + 1
+    return durations
 
 
 def part_2(ctx):
@@ -112,11 +175,40 @@ def part_2(ctx):
     end = (ctx.shape[0] - 1, ctx.shape[1] - 2)
     assert ctx.data[start] == "."
     assert ctx.data[end] == "."
-    found0 = move_to(ctx, end, start)
-    found1 = move_to(ctx, start, end)
-    found2 = move_to(ctx, end, start)
+    found0, found1, found2 = walk_trips(ctx, [(start, end), (end, start), (start, end)])
     return found0 + found1 + found2 + 2
 
 
+def random_valley(rng, width, height) -> str:
+    rows = ["#." + "#" * width]
+    for _ in range(height):
+        row = []
+        for j in range(width):
+            blizzards = "<>" if j in (0, width - 1) else "<>^v"
+            row.append(rng.choice(blizzards) if rng.random() < 0.5 else ".")
+        rows.append("#" + "".join(row) + "#")
+    rows.append("#" * width + ".#")
+    return "\n".join(rows) + "\n"
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    A valley ``scale`` tiles wide and ``scale / 4`` tall, half filled with
+    blizzards. Vertical blizzards are kept out of the entrance and exit
+    columns, as in the real inputs. Valleys are drawn again until the three
+    trips of part 2 can be made, each in a few times the width and height.
+    """
+    rng = random.Random(seed)
+    width, height = max(scale, 3), max(scale // 4, 2)
+    max_steps = min(8 * (width + height), 10000)
+    while True:
+        raw = random_valley(rng, width, height)
+        ctx = parse_input(raw)
+        start, end = (0, 1), (ctx.shape[0] - 1, ctx.shape[1] - 2)
+        trips = [(start, end), (end, start), (start, end)]
+        if None not in walk_trips(ctx, trips, max_steps):
+            return raw
+
+
 def aoc_inputs():
     return {"example": ("day24-input-ex", 18, 54), "real": ("day24-input-1", 230, 713)}
@@ -1,5 +1,6 @@
 # Skeleton for days
 import copy
+import random
 
 VALUES = {
     "-": -1,
@@ -94,6 +95,22 @@ def part_2(input):
     return 2 * len(input)
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` SNAFU numbers.
+    """
+    rng = random.Random(seed)
+    numbers = []
+    for _ in range(max(scale, 1)):
+        x = rng.randint(1, 10**12)
+        digits = []
+        while x:
+            x, r = divmod(x + 2, 5)
+            digits.append("=-012"[r])
+        numbers.append("".join(reversed(digits)))
+    return "\n".join(numbers) + "\n"
+
+
 def aoc_inputs():
     return {
         "example": ("day25-input-ex", "2=-1=0", 8),
@@ -1,3 +1,6 @@
+import random
+import string
+
 from aoc import chunks
 
 
@@ -37,5 +40,26 @@ def part_2(input):
     return sum(s)
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` groups of three rucksacks. Each rucksack has a single item in
+    both compartments, and each group a single badge.
+    """
+    rng = random.Random(seed)
+    rucksacks = []
+    for _ in range(scale):
+        badge = rng.choice(string.ascii_letters)
+        others = string.ascii_letters.replace(badge, "")
+        for _ in range(3):
+            size = rng.randint(2, 16)
+            shared, *items = rng.sample(others, 2 * size - 2)
+            left = [shared, badge] + items[: size - 2]
+            right = [shared] + items[size - 2 :]
+            rng.shuffle(left)
+            rng.shuffle(right)
+            rucksacks.append("".join(left + right))
+    return "\n".join(rucksacks) + "\n"
+
+
 def aoc_inputs():
     return {"example": ("day3-input-ex", 157, 70), "real": ("day3-input-1", 7848, 2616)}
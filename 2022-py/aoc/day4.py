@@ -1,3 +1,5 @@
+import random
+
 from aoc import ints
 
 
@@ -28,5 +30,18 @@ def part_2(input):
     return s
 
 
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` pairs of section assignments.
+    """
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(scale):
+        a, b = sorted(rng.randint(1, 99) for _ in range(2))
+        c, d = sorted(rng.randint(1, 99) for _ in range(2))
+        pairs.append(f"{a}-{b},{c}-{d}")
+    return "\n".join(pairs) + "\n"
+
+
 def aoc_inputs():
     return {"example": ("day4-input-ex", 2, 4), "real": ("day4-input-1", 450, 837)}
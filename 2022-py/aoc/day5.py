@@ -1,58 +1,94 @@
 import collections
-import copy
+import random
 import re
+import string
 
 ACTION_RE = re.compile(r"move (\d+) from (\d+) to (\d+)")
 
 
 def parse_input(raw: str):
-    stacks = collections.defaultdict(list)
+    """
+    The stacks of crates, bottom first, and the moves. Both parts start from
+    these stacks, which are not modified.
+    """
     lines = raw.splitlines()
+    crates = collections.defaultdict(list)
     line_offset = 0
-    for (li, l) in enumerate(lines):
+    for li, l in enumerate(lines):
         if l.startswith(" 1"):
+            n_stacks = len(l.split())
             line_offset = li + 2
             break
-        i = 0
-        while i < len(l):
-            if l[i] == "[":
-                stack_idx = (i // 4) + 1
-                stacks[stack_idx].append(l[i + 1])
-                i += 3
-            else:
-                i += 1
-    for s in stacks.values():
-        s.reverse()
+        for i in range(1, len(l), 4):
+            if l[i] != " ":
+                crates[i // 4].append(l[i])
+    stacks = tuple("".join(reversed(crates[i])).encode() for i in range(n_stacks))
     actions = []
     for l in lines[line_offset:]:
         actions.append(tuple(map(int, ACTION_RE.match(l).groups())))
     return stacks, actions
 
 
+def move_crates(stacks, actions, reverse):
+    """
+    Apply the moves to copies of the stacks, each moving a block of crates
+    at once, reversed if the crates are moved one at a time. Returns the
+    crates on top of each stack.
+
+    >>> move_crates((b"ZN", b"MCD", b"P"), [(1, 2, 1), (2, 1, 3)], reverse=True)
+    'ZCN'
+    >>> move_crates((b"ZN", b"MCD", b"P"), [(0, 2, 1)], reverse=False)
+    'NDP'
+    """
+    stacks = [bytearray(s) for s in stacks]
+    for n, src, dst in actions:
+        src = stacks[src - 1]
+        # Not src[-n:], which is the whole stack for n == 0
+        block = src[len(src) - n :]
+        del src[len(src) - n :]
+        if reverse:
+            block.reverse()
+        stacks[dst - 1] += block
+    return bytes(s[-1] for s in stacks).decode()
+
+
 def part_1(input):
-    stack, actions = input
-    stack = copy.deepcopy(stack)
-    for rep, src, dst in actions:
-        for _ in range(rep):
-            if stack[src]:
-                pass
-            h = stack[src].pop()
-            stack[dst].append(h)
-    return "".join(stack[i + 1][-1] for i in range(len(stack)))
+    stacks, actions = input
+    return move_crates(stacks, actions, reverse=True)
 
 
 def part_2(input):
-    stack, actions = input
-    stack = copy.deepcopy(stack)
-    for rep, src, dst in actions:
-        tmp = []
-        for _ in range(rep):
-            if stack[src]:
-                pass
-            tmp.append(stack[src].pop())
-        tmp.reverse()
-        stack[dst].extend(tmp)
-    return "".join(stack[i + 1][-1] for i in range(len(stack)))
+    stacks, actions = input
+    return move_crates(stacks, actions, reverse=False)
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` moves over 9 stacks of about ``scale / 100`` crates. Moves never
+    empty a stack, so that both parts have a crate on top of each.
+    """
+    rng = random.Random(seed)
+    n_stacks = 9
+    stacks = [
+        rng.choices(string.ascii_uppercase, k=rng.randint(2, 2 + scale // 100))
+        for _ in range(n_stacks)
+    ]
+    heights = [len(s) for s in stacks]
+    moves = []
+    for _ in range(scale):
+        src = rng.choice([i for i, h in enumerate(heights) if h > 1])
+        dst = rng.choice([i for i in range(n_stacks) if i != src])
+        n = rng.randint(1, min(heights[src] - 1, 30))
+        heights[src] -= n
+        heights[dst] += n
+        moves.append(f"move {n} from {src + 1} to {dst + 1}")
+
+    rows = []
+    for level in reversed(range(max(heights))):
+        row = " ".join(f"[{s[level]}]" if level < len(s) else "   " for s in stacks)
+        rows.append(row.rstrip())
+    rows.append(" " + "   ".join(str(i + 1) for i in range(n_stacks)))
+    return "\n".join(rows) + "\n\n" + "\n".join(moves) + "\n"
 
 
 def aoc_inputs():
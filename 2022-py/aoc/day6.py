@@ -1,22 +1,97 @@
+import collections
+import random
+import string
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
 import aoc
 
 
+@dataclass
+class Datastream:
+    """
+    A datastream left in its file, read by chunks each time it is scanned.
+    """
+
+    path: str
+    chunk_size: int = 1 << 20
+
+    def chunks(self):
+        with open(self.path, "rb") as f:
+            while chunk := f.read(self.chunk_size):
+                # The stream ends with the line
+                chunk, *end = chunk.split(b"\n", 1)
+                yield chunk
+                if end:
+                    return
+
+
 def parse_input(raw: str):
     return raw.strip()
 
 
+def parse_stream(f):
+    return Datastream(f.name)
+
+
+def find_marker(chunks: Iterable[bytes], size: int) -> Optional[int]:
+    """
+    Number of bytes read from ``chunks`` up to the end of the first window of
+    ``size`` distinct bytes. The count of each byte in the window is kept up
+    to date, and the number of distinct ones with it, so each byte read
+    costs O(1) whatever the size.
+
+    >>> find_marker([b"mjqj", memoryview(b"pqmgbljsphdztnvjfqwrcgsmlb")], 14)
+    19
+    """
+    counts = [0] * 256
+    window = collections.deque()
+    distinct = 0
+    position = 0
+    for chunk in chunks:
+        for c in chunk:
+            position += 1
+            if counts[c] == 0:
+                distinct += 1
+            counts[c] += 1
+            window.append(c)
+            if len(window) > size:
+                old = window.popleft()
+                counts[old] -= 1
+                if counts[old] == 0:
+                    distinct -= 1
+            if distinct == size:
+                return position
+    return None
+
+
+def input_chunks(input):
+    if isinstance(input, Datastream):
+        return input.chunks()
+    return [input.strip().encode()]
+
+
 def part_1(input):
-    for i in range(4, len(input)):
-        if len(set(input[i - 4 : i])) == 4:
-            return i
-    assert False, "invalid"
+    marker = find_marker(input_chunks(input), 4)
+    assert marker is not None, "invalid"
+    return marker
 
 
 def part_2(input):
-    for i in range(14, len(input)):
-        if len(set(input[i - 14 : i])) == 14:
-            return i
-    assert False
+    marker = find_marker(input_chunks(input), 14)
+    assert marker is not None
+    return marker
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    A datastream of ``scale`` characters whose markers are at its very end,
+    so that the whole stream is scanned.
+    """
+    rng = random.Random(seed)
+    # 4 distinct characters are never found among 3 possible ones.
+    noise = rng.choices("abc", k=max(scale - 14, 0))
+    return "".join(noise + rng.sample(string.ascii_lowercase, 14)) + "\n"
 
 
 def aoc_inputs():
@@ -1,75 +1,126 @@
-import networkx as nx
+import random
+from array import array
+from dataclasses import dataclass
+from typing import Iterable
 
+import aoc
 
-def parse_input(raw: str):
-    lines = raw.splitlines()
-    i = 0
-    cmds = []
-
-    while i < len(lines):
-        current = lines[i]
-        if current.startswith("$"):
-            current_cmd = current[1:].split()
-            i += 1
-            output = []
-            while i < len(lines) and not lines[i].startswith("$"):
-                output.append(lines[i])
-                i += 1
-            cmds.append((current_cmd, output))
-        else:
-            raise NotImplementedError("expecting an command")
-
-    g = nx.DiGraph()
-    path = ["/"]
-    for cmd, output in cmds:
-        if cmd[0] == "cd":
-            if cmd[1] == "/":
-                path = ["/"]
-            elif cmd[1] == "..":
-                path = path[:-1]
-            else:
-                g.add_edge("/".join(path), "/".join(path + [cmd[1]]))
-                path.append(cmd[1])
-        elif cmd[0] == "ls":
-            for r in output:
-                t, v = r.split()
-                if t == "dir":
-                    g.add_edge("/".join(path), "/".join(path + [v]))
+
+@dataclass
+class Tree:
+    """
+    Directories numbered in the order they are found, the root being 0: the
+    parent of a directory is found before it.
+    """
+
+    # Parent of each directory, -1 for the root
+    parent: array
+    # Total size of the files directly in each directory
+    own_size: array
+
+
+def parse_lines(lines: Iterable[str]) -> Tree:
+    parent = array("q", [-1])
+    own_size = array("q", [0])
+    children = [{}]
+    listed = bytearray(1)
+    cwd = 0
+    listing = False
+    for line in lines:
+        if line.startswith("$"):
+            cmd = line[1:].split()
+            # A directory listed again would count its files twice
+            listing = cmd[0] == "ls" and not listed[cwd]
+            if listing:
+                listed[cwd] = 1
+            elif cmd[0] == "cd":
+                if cmd[1] == "/":
+                    cwd = 0
+                elif cmd[1] == "..":
+                    cwd = max(parent[cwd], 0)
                 else:
-                    g.nodes["/".join(path)][v] = int(t)
-    return g
-
-
-def directory_size(i, sizes, g: nx.DiGraph):
-    local_size = sum(g.nodes[i].values())
-    for j in g.successors(i):
-        if child_size := sizes.get(j):
-            local_size += child_size
-        else:
-            child_size = directory_size(j, sizes, g)
-            sizes[j] = child_size
-            local_size += child_size
-    return local_size
-
-
-def part_1(input: nx.DiGraph):
-    sizes = {}
-    total = 0
-    assert nx.is_tree(input)
-    for i, n in input.nodes.data():
-        dir_size = directory_size(i, sizes, input)
-        if dir_size < 100000:
-            total += dir_size
-    return total
-
-
-def part_2(input):
+                    cwd = subdirectory(parent, own_size, children, listed, cwd, cmd[1])
+        elif listing:
+            t, name = line.split()
+            if t == "dir":
+                subdirectory(parent, own_size, children, listed, cwd, name)
+            else:
+                own_size[cwd] += int(t)
+    return Tree(parent, own_size)
+
+
+def subdirectory(parent, own_size, children, listed, cwd, name) -> int:
+    i = children[cwd].get(name)
+    if i is None:
+        i = children[cwd][name] = len(parent)
+        parent.append(cwd)
+        own_size.append(0)
+        children.append({})
+        listed.append(0)
+    return i
+
+
+def parse_input(raw: str):
+    return parse_lines(raw.splitlines())
+
+
+def parse_stream(f):
+    return parse_lines(aoc.stream_lines(f))
+
+
+def directory_sizes(tree: Tree) -> array:
+    """
+    Total size of each directory, accumulated from the deepest ones up in a
+    single pass: children come after their parent.
+
+    >>> list(directory_sizes(Tree(array("q", [-1, 0, 1, 0]), array("q", [1, 2, 4, 8]))))
+    [15, 6, 4, 8]
+    """
+    sizes = array("q", tree.own_size)
+    parent = tree.parent
+    for i in range(len(sizes) - 1, 0, -1):
+        sizes[parent[i]] += sizes[i]
+    return sizes
+
+
+def part_1(input: Tree):
+    return sum(s for s in directory_sizes(input) if s < 100000)
+
+
+def part_2(input: Tree):
     threshold = 30000000
-    sizes = {}
-    mem_used = directory_size("/", sizes, input)
-    mem_free = 70000000 - mem_used
-    s = [directory_size(i, sizes, input) for i in input.nodes]
-    return min(x for x in s if mem_free + x > threshold)
+    sizes = directory_sizes(input)
+    mem_free = 70000000 - sizes[0]
+    return min(x for x in sizes if mem_free + x > threshold)
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    A terminal session exploring a random tree of ``scale`` directories.
+    """
+    rng = random.Random(seed)
+    children = [[] for _ in range(max(scale, 1))]
+    for i in range(1, len(children)):
+        children[rng.randrange(i)].append(i)
+
+    output = ["$ cd /"]
+    # Directories to list, or None to go back to the parent.
+    to_visit = [0]
+    while to_visit:
+        d = to_visit.pop()
+        if d is None:
+            output.append("$ cd ..")
+            continue
+        if d != 0:
+            output.append(f"$ cd d{d}")
+        output.append("$ ls")
+        output.extend(f"dir d{c}" for c in children[d])
+        for k in range(rng.randint(0, 4)):
+            output.append(f"{rng.randint(1000, 300000)} f{k}.txt")
+        for c in reversed(children[d]):
+            to_visit.append(None)
+            to_visit.append(c)
+    return "\n".join(output) + "\n"
 
 
 def aoc_inputs():
@@ -1,63 +1,93 @@
-import numpy as np
+import random
+import string
 
 
 def parse_input(raw: str):
-    m = [list(map(int, row)) for row in raw.splitlines()]
-    return np.array(m, dtype=np.int32)
+    import numpy as np
 
+    rows = raw.split()
+    digits = np.frombuffer("".join(rows).encode(), dtype=np.uint8)
+    return (digits.reshape(len(rows), -1) - ord("0")).astype(np.int32)
 
-def is_visible(m, i, j):
-    cur = m[i, j]
-    r = (
-        np.all(m[:i, j] < cur)
-        or np.all(m[i + 1 :, j] < cur)
-        or np.all(m[i, :j] < cur)
-        or np.all(m[i, j + 1 :] < cur)
-    )
-    return r
+
+# Views of a forest looking along its rows from each side, with the way
+# back to the forest
+VIEWS = [
+    (lambda a: a, lambda a: a),
+    (lambda a: a[:, ::-1], lambda a: a[:, ::-1]),
+    (lambda a: a.T, lambda a: a.T),
+    (lambda a: a.T[:, ::-1], lambda a: a[:, ::-1].T),
+]
+
+
+def from_each_side(f, m):
+    """
+    ``f``, computed looking along the rows from the left, from every side.
+    """
+    return [back(f(view(m))) for view, back in VIEWS]
+
+
+def visible_from_left(m):
+    """
+    >>> import numpy as np
+    >>> visible_from_left(np.array([[3, 0, 3, 7, 3]])).astype(int)
+    array([[1, 0, 0, 1, 0]])
+    """
+    import numpy as np
+
+    tallest_before = np.full_like(m, -1)
+    np.maximum.accumulate(m[:, :-1], axis=1, out=tallest_before[:, 1:])
+    return m > tallest_before
+
+
+def viewing_distances(m):
+    """
+    Number of trees seen looking left from each tree, up to the first one at
+    least as tall or the edge. This is a monotonic stack whose entries are
+    at most one per height: the column of the last tree of at least each
+    height, updated for all the rows at once.
+
+    >>> import numpy as np
+    >>> viewing_distances(np.array([[2, 5, 5, 1, 2]]))
+    array([[0, 1, 1, 1, 2]], dtype=int32)
+    """
+    import numpy as np
+
+    h, w = m.shape
+    heights = np.arange(int(m.max(initial=0)) + 1)[:, None]
+    rows = np.arange(h)
+    # 0 is the edge, which stops the view too
+    last = np.zeros((len(heights), h), dtype=np.int32)
+    # Columns are walked through, one after the other in memory
+    columns = np.ascontiguousarray(m.T)
+    distances = np.empty((w, h), dtype=np.int32)
+    for j, column in enumerate(columns):
+        distances[j] = j - last[column, rows]
+        np.putmask(last, heights <= column, j)
+    return distances.T
 
 
 def part_1(input):
-    w, h = input.shape
-    edges = w * h - (w - 2) * (h - 2)
-    inner_visible = 0
-    for i in range(1, h - 1):
-        for j in range(1, w - 1):
-            inner_visible += int(is_visible(input, i, j))
-    return edges + inner_visible
-
-
-def viewing_distance(xs, cur):
-    score = 0
-    for ii in xs:
-        if ii >= cur:
-            return score + 1
-        score += 1
-    return score
-
-
-def scenic_score(m: np.ndarray, i, j):
-    cur = m[i, j]
-    total = 1
-    total *= viewing_distance(m[:i, j][::-1], cur)
-    total *= viewing_distance(m[i + 1 :, j], cur)
-    total *= viewing_distance(m[i, :j][::-1], cur)
-    total *= viewing_distance(m[i, j + 1 :], cur)
-    return total
+    import numpy as np
+
+    return int(np.logical_or.reduce(from_each_side(visible_from_left, input)).sum())
 
 
 def part_2(input):
-    # print("score:", scenic_score(input, 1, 2))
-    # print("score:", scenic_score(input, 3, 2))
-    w, h = input.shape
-    scores = np.zeros_like(input, dtype=np.int64)
-    for i in range(1, h - 1):
-        for j in range(1, w - 1):
-            s = scenic_score(input, i, j)
-            assert s < 2**63
-            scores[i, j] = s
-            # inner_visible += int(is_visible(input, i, j))
-    return np.max(scores)
+    import numpy as np
+
+    distances = from_each_side(viewing_distances, input)
+    scores = np.prod([d.astype(np.int64) for d in distances], axis=0)
+    return int(scores.max())
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    A ``scale`` x ``scale`` forest.
+    """
+    rng = random.Random(seed)
+    rows = ["".join(rng.choices(string.digits, k=scale)) for _ in range(scale)]
+    return "\n".join(rows) + "\n"
 
 
 def aoc_inputs():
@@ -1,64 +1,103 @@
-from collections import defaultdict
+import random
+
+import aoc
+from aoc import jit
 
 MOVES = {"R": (1, 0), "L": (-1, 0), "U": (0, -1), "D": (0, 1)}
 
 
-def parse_input(raw: str):
+def parse_lines(lines):
     input = []
-    for line in raw.splitlines():
+    for line in lines:
         d, cnt = line.split()
         input.append((d, MOVES[d], int(cnt)))
     return input
 
 
-def is_adjacent(x, y):
-    return abs(x[0] - y[0]) <= 1 and abs(x[1] - y[1]) <= 1
-
-
-def clip(x, x_min, x_max):
-    return max(min(x, x_max), x_min)
-
-
-def diag(x, y):
-    return clip(x[0] - y[0], -1, 1), clip(x[1] - y[1], -1, 1)
+def parse_input(raw: str):
+    return parse_lines(raw.splitlines())
+
+
+def parse_stream(f):
+    return parse_lines(aoc.stream_lines(f))
+
+
+def moves_array(input):
+    import numpy as np
+
+    return np.array([(dx, dy, cnt) for _, (dx, dy), cnt in input], dtype=np.int64)
+
+
+@jit.kernel
+def is_straight(xs, ys, dx, dy):
+    """
+    Whether each knot is right behind the previous one, moving along
+    ``(dx, dy)``.
+    """
+    for i in range(1, len(xs)):
+        if xs[i - 1] - xs[i] != dx or ys[i - 1] - ys[i] != dy:
+            return False
+    return True
+
+
+@jit.kernel
+def rope_coverage(moves, n_knots):
+    """
+    Number of positions visited by the tail of a rope of ``n_knots``, for
+    ``moves`` given as rows of (dx, dy, count).
+
+    >>> import numpy as np
+    >>> rope_coverage(np.array([(1, 0, 4), (0, -1, 4), (-1, 0, 3)]), 2)
+    9
+    """
+    xs = [0] * n_knots
+    ys = [0] * n_knots
+    # Positions packed in an int, for a set of ints
+    visited = {0}
+    for m in range(len(moves)):
+        dx, dy, count = moves[m, 0], moves[m, 1], moves[m, 2]
+        step = 0
+        while step < count:
+            step += 1
+            xs[0] += dx
+            ys[0] += dy
+            # Whether every knot moved, the rope can only be straight then
+            pulled = True
+            for i in range(1, n_knots):
+                ddx, ddy = xs[i - 1] - xs[i], ys[i - 1] - ys[i]
+                if abs(ddx) <= 1 and abs(ddy) <= 1:
+                    pulled = False
+                    break
+                xs[i] += min(max(ddx, -1), 1)
+                ys[i] += min(max(ddy, -1), 1)
+            visited.add(xs[-1] * 2**32 + ys[-1])
+            if pulled and step < count and is_straight(xs, ys, dx, dy):
+                # The whole rope moves along with the head from now on
+                remaining = count - step
+                for k in range(1, remaining + 1):
+                    visited.add((xs[-1] + k * dx) * 2**32 + ys[-1] + k * dy)
+                for i in range(n_knots):
+                    xs[i] += remaining * dx
+                    ys[i] += remaining * dy
+                step = count
+    return len(visited)
 
 
 def part_1(input):
-    # print(input)
-    h_coords = (0, 0)
-    t_coords = (0, 0)
-    covered = defaultdict(int)
-    for _, (dx, dy), cnt in input:
-        for k in range(cnt):
-            h_new = (h_coords[0] + dx, h_coords[1] + dy)
-            if not is_adjacent(t_coords, h_new):
-                t_coords = h_coords
-            h_coords = h_new
-            covered[t_coords] += 1
-    return len(covered)
-
-
-def align(head, tail):
-    if is_adjacent(head, tail):
-        return tail
-    d = diag(head, tail)
-    return tail[0] + d[0], tail[1] + d[1]
+    return rope_coverage(moves_array(input), 2)
 
 
 def part_2(input):
-    parts = 10
-    snake = [(0, 0) for _ in range(parts)]
-    covered = defaultdict(int)
-    for _, (dx, dy), cnt in input:
-        for k in range(cnt):
-            # move the head
-            snake[0] = (snake[0][0] + dx, snake[0][1] + dy)
-            for i in range(1, len(snake)):
-                if is_adjacent(snake[i], snake[i - 1]):
-                    break
-                snake[i] = align(snake[i - 1], snake[i])
-            covered[snake[-1]] += 1
-    return len(covered)
+    return rope_coverage(moves_array(input), 10)
+
+
+def generate(scale: int, seed=0) -> str:
+    """
+    ``scale`` head motions.
+    """
+    rng = random.Random(seed)
+    moves = [f"{rng.choice('UDLR')} {rng.randint(1, 20)}" for _ in range(scale)]
+    return "\n".join(moves) + "\n"
 
 
 def aoc_inputs():
@@ -0,0 +1,183 @@
+import numpy as np
+
+
+class Grid:
+    """
+    Dense counterpart of ``SparseMap``, with the same ``(x, y) -> char`` API.
+
+    Characters are stored as uint8 in a numpy array which grows when a cell
+    outside of it is written. A cell holding the default character is empty:
+    it is not ``in`` the grid and does not count in its limits.
+
+    >>> g = Grid({(0, 0): "#"}, default=".")
+    >>> g[3, -1] = "#"
+    >>> g.limits()
+    ((0, 3), (-1, 0))
+    >>> (1, 0) in g, g[1, 0], g.get((3, -1))
+    (False, '.', '#')
+    >>> g.draw().splitlines()
+    ['...#', '#...']
+    """
+
+    def __init__(self, data=None, default=" ", shape=(16, 16)):
+        self.default = default
+        self.empty = ord(default)
+        self.cells = np.full(shape, self.empty, dtype=np.uint8)
+        # Coordinates of cells[0, 0]
+        self.origin = (0, 0)
+        # (x_min, x_max, y_min, y_max) of the non-empty cells, None when the
+        # grid is empty or unknown after a deletion.
+        self._bounds = None
+        self._bounds_valid = True
+        for k, v in (data or {}).items():
+            self[k] = v
+
+    @classmethod
+    def from_lines(cls, lines, default=" "):
+        data = {}
+        for line_num, line in enumerate(lines):
+            for col_num, char in enumerate(line.strip()):
+                data[(line_num, col_num)] = char
+        return cls(data, default)
+
+    @property
+    def data(self):
+        # Call sites written for SparseMap access the underlying dict.
+        return self
+
+    def _index(self, key):
+        i, j = key[0] - self.origin[0], key[1] - self.origin[1]
+        w, h = self.cells.shape
+        if 0 <= i < w and 0 <= j < h:
+            return i, j
+        return None
+
+    def _grow(self, x, y):
+        (ox, oy), (w, h) = self.origin, self.cells.shape
+        x_lo, x_hi = min(ox, x), max(ox + w, x + 1)
+        y_lo, y_hi = min(oy, y), max(oy + h, y + 1)
+        # Grow at least by a factor 2 along each enlarged axis, towards the
+        # new cell, to amortize the copies.
+        if x_hi - x_lo > w:
+            if x < ox:
+                x_lo = min(x_lo, x_hi - 2 * w)
+            else:
+                x_hi = max(x_hi, x_lo + 2 * w)
+        if y_hi - y_lo > h:
+            if y < oy:
+                y_lo = min(y_lo, y_hi - 2 * h)
+            else:
+                y_hi = max(y_hi, y_lo + 2 * h)
+        cells = np.full((x_hi - x_lo, y_hi - y_lo), self.empty, dtype=np.uint8)
+        cells[ox - x_lo : ox - x_lo + w, oy - y_lo : oy - y_lo + h] = self.cells
+        self.cells = cells
+        self.origin = x_lo, y_lo
+
+    def __getitem__(self, item):
+        idx = self._index(item)
+        if idx is None:
+            return self.default
+        return chr(self.cells.item(idx))
+
+    def get(self, item, default=None):
+        idx = self._index(item)
+        if idx is None:
+            return default
+        v = self.cells.item(idx)
+        return default if v == self.empty else chr(v)
+
+    def __contains__(self, item):
+        idx = self._index(item)
+        return idx is not None and self.cells.item(idx) != self.empty
+
+    def __setitem__(self, key, value):
+        x, y = key
+        idx = self._index(key)
+        if idx is None:
+            self._grow(x, y)
+            idx = self._index(key)
+        self.cells[idx] = ord(value)
+        if value == self.default or not self._bounds_valid:
+            self._bounds_valid = False
+        elif self._bounds is None:
+            self._bounds = (x, x, y, y)
+        else:
+            x_min, x_max, y_min, y_max = self._bounds
+            if not (x_min <= x <= x_max and y_min <= y <= y_max):
+                self._bounds = (
+                    min(x_min, x),
+                    max(x_max, x),
+                    min(y_min, y),
+                    max(y_max, y),
+                )
+
+    def __delitem__(self, key):
+        idx = self._index(key)
+        if idx is None or self.cells.item(idx) == self.empty:
+            raise KeyError(key)
+        self.cells[idx] = self.empty
+        self._bounds_valid = False
+
+    def __len__(self):
+        return int(np.count_nonzero(self.cells != self.empty))
+
+    def keys(self):
+        xs, ys = np.nonzero(self.cells != self.empty)
+        ox, oy = self.origin
+        return [(x + ox, y + oy) for x, y in zip(xs.tolist(), ys.tolist())]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def limits(self):
+        if not self._bounds_valid:
+            xs, ys = np.nonzero(self.cells != self.empty)
+            self._bounds = None
+            if len(xs):
+                ox, oy = self.origin
+                self._bounds = (
+                    int(xs.min()) + ox,
+                    int(xs.max()) + ox,
+                    int(ys.min()) + oy,
+                    int(ys.max()) + oy,
+                )
+            self._bounds_valid = True
+        if self._bounds is None:
+            return (0, 0), (0, 0)
+        x_min, x_max, y_min, y_max = self._bounds
+        return (x_min, x_max), (y_min, y_max)
+
+    def window(self):
+        """
+        View of the cells within the limits, indexed by ``[x, y]``.
+        """
+        (x_min, x_max), (y_min, y_max) = self.limits()
+        ox, oy = self.origin
+        return self.cells[x_min - ox : x_max - ox + 1, y_min - oy : y_max - oy + 1]
+
+    def draw(self, revert=False):
+        if len(self) == 0:
+            return self.default
+        return "\n".join(row.tobytes().decode() for row in self.window().T)
+
+    def neighbour_counts(self, value="#", diagonal=True):
+        """
+        Number of neighbours of each cell of ``cells`` holding ``value``.
+
+        >>> g = Grid({(0, 0): "#", (1, 0): "#", (1, 1): "#"}, default=".")
+        >>> c = g.neighbour_counts()
+        >>> int(c[0, 0]), int(c[0, 1]), int(c[2, 2])
+        (2, 3, 1)
+        """
+        occupied = np.pad(self.cells == ord(value), 1).astype(np.uint8)
+        w, h = self.cells.shape
+        counts = np.zeros((w, h), dtype=np.uint8)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if (dx, dy) == (0, 0) or (not diagonal and dx != 0 and dy != 0):
+                    continue
+                counts += occupied[1 + dx : 1 + dx + w, 1 + dy : 1 + dy + h]
+        return counts
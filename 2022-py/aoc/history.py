@@ -0,0 +1,140 @@
+"""
+History of the stage timings of every run, kept in a local SQLite database,
+to follow the trend of each stage and catch the commit that slowed it down.
+"""
+import contextlib
+import functools
+import platform
+import sqlite3
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import aoc
+from aoc.bench import percentile
+
+HISTORY_FILE = Path(".aoc-history.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stages (
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    rss_peak INTEGER,
+    traced_peak INTEGER,
+    git_commit TEXT,
+    python TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stages_day ON stages (day, key, stage, timestamp);
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def git_commit() -> Optional[str]:
+    """
+    Commit of the working tree, with a ``+`` when it has local changes.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+" if status else "")
+
+
+def connect(path: Path = HISTORY_FILE) -> sqlite3.Connection:
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+def record(results: Iterable["aoc.RunResult"], path: Path = HISTORY_FILE):
+    now = time.time()
+    commit, python = git_commit(), platform.python_version()
+    rows = [
+        (
+            now,
+            r.day,
+            r.key,
+            s.name,
+            s.elapsed,
+            s.rss_peak,
+            s.traced_peak,
+            commit,
+            python,
+        )
+        for r in results
+        for s in r.stages
+    ]
+    with contextlib.closing(connect(path)) as db, db:
+        db.executemany("INSERT INTO stages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def load(day, path: Path = HISTORY_FILE) -> List[sqlite3.Row]:
+    with contextlib.closing(connect(path)) as db:
+        return db.execute(
+            "SELECT * FROM stages WHERE day = ? ORDER BY key, stage, timestamp",
+            (day,),
+        ).fetchall()
+
+
+def flag_regressions(elapsed: List[float], window=10, threshold=0.2, min_delta=1e-3):
+    """
+    For each timing of a series, the median of the ``window`` previous ones
+    (None for the first) and whether it is slower than this median by more
+    than ``threshold`` (relative) and ``min_delta`` seconds (absolute).
+
+    >>> flag_regressions([1.0, 1.1, 0.9, 1.0, 1.5], window=3)
+    [(None, False), (1.0, False), (1.0, False), (1.0, False), (1.0, True)]
+    """
+    flags = []
+    for i, x in enumerate(elapsed):
+        previous = elapsed[max(i - window, 0) : i]
+        if not previous:
+            flags.append((None, False))
+            continue
+        median = percentile(previous, 50)
+        flags.append((median, x > median * (1 + threshold) and x - median > min_delta))
+    return flags
+
+
+def format_row(prefix, row, median, regression):
+    date = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["timestamp"]))
+    line = (
+        f"{prefix}{date} {row['git_commit'] or '-':>9} py{row['python']:<8} "
+        f"{row['elapsed']:.4f}s"
+    )
+    if median is not None:
+        line += f" (median {median:.4f}s, {row['elapsed'] / median - 1:+.1%})"
+    if regression:
+        line = f"{aoc.C_RED}{line} regression{aoc.C_ENDCOLOR}"
+    return line
+
+
+def job_costs(window=10, path: Path = HISTORY_FILE) -> Dict[str, float]:
+    """
+    Median total time of the ``window`` last runs of each "day.key" job.
+    """
+    with contextlib.closing(connect(path)) as db:
+        rows = db.execute(
+            "SELECT day, key, SUM(elapsed) AS total FROM stages"
+            " GROUP BY timestamp, day, key ORDER BY timestamp"
+        ).fetchall()
+    totals = {}
+    for row in rows:
+        totals.setdefault(f"{row['day']}.{row['key']}", []).append(row["total"])
+    return {job: percentile(t[-window:], 50) for job, t in totals.items()}
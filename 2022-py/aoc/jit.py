@@ -0,0 +1,83 @@
+"""
+Optional numba compilation of the numeric kernels of the days.
+
+A ``@kernel`` is a plain Python function, compiled with ``numba.njit`` on
+its first call when the JIT is enabled (``--jit``) and numba is importable.
+Kernels only take numbers and numpy arrays, they can call other kernels but
+no other Python function, and cannot allocate arrays: these are given by
+their callers.
+
+Some kernels only pay off once compiled (cellular updates looping over every
+cell of a grid): days check ``enabled()`` to keep their Python algorithm
+otherwise.
+"""
+import functools
+import sys
+import types
+
+_enabled = False
+
+
+@functools.lru_cache(maxsize=None)
+def available() -> bool:
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def enable(flag=True):
+    global _enabled
+    if flag and not _enabled and not available():
+        print("warning: numba is not installed, kernels run in Python", file=sys.stderr)
+    _enabled = flag
+
+
+def enabled() -> bool:
+    return _enabled and available()
+
+
+class Kernel:
+    def __init__(self, fn, **options):
+        functools.update_wrapper(self, fn)
+        self.fn = fn
+        self.options = options
+        self.compiled = None
+
+    def compile(self):
+        if self.compiled is None:
+            import numba
+
+            fn = self.fn
+            # numba resolves the globals of the function when compiling it,
+            # the kernels it calls are swapped for their compiled version.
+            kernels = {
+                name: fn.__globals__[name].compile()
+                for name in fn.__code__.co_names
+                if isinstance(fn.__globals__.get(name), Kernel)
+            }
+            if kernels:
+                fn = types.FunctionType(
+                    fn.__code__,
+                    fn.__globals__ | kernels,
+                    fn.__name__,
+                    fn.__defaults__,
+                    fn.__closure__,
+                )
+            self.compiled = numba.njit(cache=True, **self.options)(fn)
+        return self.compiled
+
+    def __call__(self, *args):
+        if enabled():
+            return self.compile()(*args)
+        return self.fn(*args)
+
+
+def kernel(fn=None, **options):
+    """
+    Declare a kernel, ``options`` are given to ``numba.njit``.
+    """
+    if fn is None:
+        return lambda fn: Kernel(fn, **options)
+    return Kernel(fn, **options)
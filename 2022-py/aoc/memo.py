@@ -0,0 +1,205 @@
+"""
+Memoization of recursive solvers, with a bounded cache and counters.
+
+``@memo(key=..., maxsize=..., policy=...)`` caches the results of a
+function by ``key(*args)``, its arguments by default. ``pack`` turns tuples
+of small integers into a single int, a much smaller key than the tuple. Once
+``maxsize`` entries are cached, one is evicted for each new one: the least
+recently used ("lru"), or an approximation of it costing less on hits
+("clock").
+
+The hits, misses and evictions of every cache are reported per stage by the
+runner, see ``reset_stats`` and ``stats``, and the caches are emptied after
+each stage, see ``clear_caches``.
+"""
+import collections
+import functools
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+MISSING = object()
+
+_caches = []
+
+
+def pack(values: Iterable[int], bits: int) -> int:
+    """
+    Pack non-negative ints taking ``bits`` bits each into one int, the first
+    of ``values`` in the high bits, and not bounded.
+
+    >>> hex(pack((1, 2, 3), 4)), hex(pack((0x1234, 5), 8))
+    ('0x123', '0x123405')
+    """
+    k = 0
+    for v in values:
+        k = k << bits | int(v)
+    return k
+
+
+class DictCache(dict):
+    evictions = 0
+
+    def __init__(self):
+        super().__init__()
+        # Called by memo on every call, as builtins: see ClockCache
+        self.lookup, self.touch = self.get, None
+
+    def put(self, key, value):
+        self[key] = value
+
+
+class LruCache(collections.OrderedDict):
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+        self.evictions = 0
+        self.lookup, self.touch = self.get, self.move_to_end
+
+    def put(self, key, value):
+        if len(self) >= self.maxsize:
+            self.popitem(last=False)
+            self.evictions += 1
+        self[key] = value
+
+
+class ClockCache:
+    """
+    Entries are kept in a ring of slots, and marked when they are used. To
+    make room, the hand of the clock goes round the ring unmarking the
+    entries it finds marked, and evicts the first one which is not.
+
+    Hits only cost a dict lookup and a set insertion, ``lookup`` and
+    ``touch`` being builtin methods: they are not replaced when the cache
+    is cleared.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self.data = {}
+        self.ring = []
+        self.used = set()
+        self.hand = 0
+        self.lookup, self.touch = self.data.get, self.used.add
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        self.data.clear()
+        self.ring.clear()
+        self.used.clear()
+        self.hand = 0
+
+    def put(self, key, value):
+        data, ring = self.data, self.ring
+        if len(ring) < self.maxsize:
+            data[key] = value
+            ring.append(key)
+            return
+        used, hand = self.used, self.hand
+        while ring[hand] in used:
+            used.discard(ring[hand])
+            hand = (hand + 1) % self.maxsize
+        del data[ring[hand]]
+        self.evictions += 1
+        data[key] = value
+        ring[hand] = key
+        self.hand = (hand + 1) % self.maxsize
+
+
+POLICIES = {"lru": LruCache, "clock": ClockCache}
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: Optional[int]
+
+
+def memo(fn=None, *, key=None, maxsize: Optional[int] = None, policy="lru"):
+    """
+    Cache the results of ``fn``. The cache is not cleared between calls
+    from the outside: solvers call ``fn.cache_clear()`` when the arguments
+    left out of ``key`` change.
+
+    >>> @memo(key=lambda n: n, maxsize=3)
+    ... def fib(n):
+    ...     return n if n < 2 else fib(n - 1) + fib(n - 2)
+    >>> fib(30), fib.cache_info()
+    (832040, CacheInfo(hits=28, misses=31, evictions=28, size=3, maxsize=3))
+    """
+    if fn is None:
+        return functools.partial(memo, key=key, maxsize=maxsize, policy=policy)
+    cache = DictCache() if maxsize is None else POLICIES[policy](maxsize)
+    lookup, touch = cache.lookup, cache.touch
+    # hits, misses
+    counts = [0, 0]
+
+    @functools.wraps(fn)
+    def wrapper(*args):
+        k = args if key is None else key(*args)
+        value = lookup(k, MISSING)
+        if value is not MISSING:
+            counts[0] += 1
+            if touch is not None:
+                touch(k)
+            return value
+        counts[1] += 1
+        value = fn(*args)
+        cache.put(k, value)
+        return value
+
+    def cache_info():
+        return CacheInfo(counts[0], counts[1], cache.evictions, len(cache), maxsize)
+
+    def reset_stats():
+        counts[:] = [0, 0]
+        cache.evictions = 0
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache.clear
+    wrapper.reset_stats = reset_stats
+    _caches.append(wrapper)
+    return wrapper
+
+
+def reset_stats():
+    for wrapper in _caches:
+        wrapper.reset_stats()
+
+
+def clear_caches():
+    """
+    Empty every cache, which the runner does after each part: the stats
+    are kept until ``reset_stats``.
+    """
+    for wrapper in _caches:
+        wrapper.cache_clear()
+
+
+def stats() -> Dict[str, Tuple[int, int, int]]:
+    """
+    The hits, misses and evictions of the caches used since ``reset_stats``.
+    """
+    found = {}
+    for wrapper in _caches:
+        info = wrapper.cache_info()
+        if info.hits or info.misses:
+            found[wrapper.__qualname__] = info.hits, info.misses, info.evictions
+    return found
+
+
+def format_stats(stats: Dict[str, Tuple[int, int, int]]) -> str:
+    """
+    >>> format_stats({"f": (3, 1, 0)})
+    'memo f: 75.0% hits of 4, 0 evictions'
+    """
+    parts = []
+    for name, (hits, misses, evictions) in stats.items():
+        calls = hits + misses
+        parts.append(
+            f"memo {name}: {hits / calls:.1%} hits of {calls}, {evictions} evictions"
+        )
+    return ", ".join(parts)
@@ -0,0 +1,78 @@
+"""
+Peak memory accounting of the runner stages.
+
+The peak RSS of a stage is measured by resetting the kernel high-water mark
+before the stage (Linux only, through /proc/self/clear_refs). Elsewhere, the
+process-wide ``ru_maxrss`` is used, which only reports how much a stage
+raised the peak reached by the previous stages.
+"""
+import contextlib
+import re
+import resource
+import sys
+import tracemalloc
+from pathlib import Path
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def _proc_status_kib(field):
+    m = re.search(rf"{field}:\s+(\d+) kB", PROC_STATUS.read_text())
+    return int(m.group(1))
+
+
+def _maxrss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def reset_peak_rss() -> int:
+    """
+    Reset the peak RSS if supported, returns the value peaks are relative to.
+    """
+    try:
+        PROC_CLEAR_REFS.write_text("5")
+        return _proc_status_kib("VmRSS") * 1024
+    except OSError:
+        return _maxrss()
+
+
+def peak_rss() -> int:
+    try:
+        return _proc_status_kib("VmHWM") * 1024
+    except OSError:
+        return _maxrss()
+
+
+@contextlib.contextmanager
+def measure(stage, trace=False):
+    """
+    Record the peak RSS increase of the enclosed code in ``stage``, and the
+    peak of memory allocated by Python if ``trace`` is set.
+    """
+    started = False
+    if trace:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started = True
+        tracemalloc.reset_peak()
+        traced_base = tracemalloc.get_traced_memory()[0]
+    rss_base = reset_peak_rss()
+    try:
+        yield
+    finally:
+        stage.rss_peak = max(peak_rss() - rss_base, 0)
+        if trace:
+            stage.traced_peak = tracemalloc.get_traced_memory()[1] - traced_base
+            if started:
+                tracemalloc.stop()
+
+
+def format_size(n):
+    """
+    >>> format_size(3 * 2**20)
+    '3.0MiB'
+    """
+    return f"{n / 2**20:.1f}MiB"
@@ -0,0 +1,66 @@
+"""
+CPU (cProfile) and memory (tracemalloc) profiling of the runner stages.
+"""
+import contextlib
+import cProfile
+import pstats
+import tracemalloc
+from pathlib import Path
+
+
+def hot_functions(stats: pstats.Stats, top=10):
+    rows = sorted(stats.stats.items(), key=lambda x: x[1][2], reverse=True)[:top]
+    lines = []
+    for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in rows:
+        location = f"{Path(filename).name}:{lineno}({func})"
+        lines.append(f"{ncalls:>10} {tottime:8.4f}s {cumtime:8.4f}s  {location}")
+    return lines
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, top=10):
+    lines = []
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        location = f"{Path(frame.filename).name}:{frame.lineno}"
+        lines.append(f"{stat.size / 1024:10.1f}KiB {stat.count:>8}  {location}")
+    return lines
+
+
+@contextlib.contextmanager
+def profiled(mode, path: Path, top=10, report_size=50):
+    """
+    Profile the enclosed code, dump the full report to ``path`` (with a
+    ``.prof`` or ``.txt`` suffix) and print the ``top`` entries.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if mode == "cpu":
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            path = path.with_name(path.name + ".prof")
+            profile.dump_stats(path)
+            lines = hot_functions(pstats.Stats(profile), top)
+            header = f"{'ncalls':>10} {'tottime':>9} {'cumtime':>9}  function"
+    elif mode == "mem":
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            snapshot = snapshot.filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            path = path.with_name(path.name + ".txt")
+            path.write_text("\n".join(top_allocations(snapshot, report_size)))
+            lines = top_allocations(snapshot, top)
+            header = f"{'size':>13} {'count':>8}  location"
+    else:
+        raise ValueError(f"unknown profiling mode: {mode}")
+    print(f"{mode} profile written to {path}")
+    print(header)
+    for line in lines:
+        print(line)
@@ -0,0 +1,118 @@
+"""
+Empirical complexity of the days, measured on inputs of growing size made by
+the ``generate(scale, seed)`` function of each day.
+"""
+import math
+import tempfile
+import traceback
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aoc
+
+
+def geometric_range(lo: int, hi: int, factor: float) -> List[int]:
+    """
+    >>> geometric_range(10, 100, 2)
+    [10, 20, 40, 80]
+    >>> geometric_range(1, 3, 1.1)
+    [1, 2, 3]
+    """
+    scales = []
+    x = lo
+    while x <= hi:
+        scales.append(x)
+        x = max(round(x * factor), x + 1)
+    return scales
+
+
+def fit_exponent(scales: List[float], timings: List[float]) -> float:
+    """
+    Slope of the least-squares line of log(timing) against log(scale), that
+    is the ``k`` of a ``O(n^k)`` behaviour.
+
+    >>> round(fit_exponent([10, 20, 40], [1.0, 4.0, 16.0]), 3)
+    2.0
+    """
+    xs = [math.log(s) for s in scales]
+    ys = [math.log(t) for t in timings]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - x_mean) ** 2 for x in xs)
+    sxy = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    return sxy / sxx
+
+
+def run_scale(runner, m, tmp, scale, seed, verbose) -> "aoc.RunResult":
+    """
+    Run ``runner`` on the input of ``scale``, an exception raised while
+    generating or running it being the error of the run, like
+    ``verify.check_job``.
+    """
+    # Generated inputs go through a file, like the real ones, so that
+    # parse_stream and parse_buffer are measured too.
+    path = Path(tmp) / f"{runner.day}-{scale}"
+    prefix = f"scale-{scale}"
+    try:
+        path.write_text(m.generate(scale, seed))
+        return runner.run(path, prefix=prefix, verbose=verbose)
+    except Exception as e:
+        stage = aoc.StageResult("run", 0.0)
+        stage.error = traceback.format_exception_only(type(e), e)[-1].strip()
+        if verbose:
+            print(aoc.format_stage(f"[{runner.day}.{prefix}] ", stage))
+        return aoc.RunResult(runner.day, prefix, [stage])
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def scale_run(day, scales, seed=0, budget=10.0, options=None, verbose=True):
+    """
+    Run ``day`` on a generated input of each scale, in order, until a run
+    takes more than ``budget`` seconds. Returns the ``(scale, RunResult)``.
+
+    A first run at the smallest scale is left out, as it also pays for the
+    lazy imports of the day and for compiling its kernels.
+    """
+    m = aoc.load_day(day)
+    runner, _ = aoc._load_module(day, m, options=options)
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if scales:
+            run_scale(runner, m, tmp, scales[0], seed, verbose=False)
+        for scale in scales:
+            result = run_scale(runner, m, tmp, scale, seed, verbose)
+            runs.append((scale, result))
+            if result.elapsed > budget:
+                break
+    return runs
+
+
+def exponents(
+    runs: List[Tuple[int, "aoc.RunResult"]], min_time=1e-3
+) -> Dict[str, Tuple[Optional[float], int]]:
+    """
+    Fitted exponent of each stage, and the number of runs it is fitted on.
+    Runs faster than ``min_time`` are mostly noise and ignored, as are the
+    stages which failed. The exponent is None if fewer than 2 runs are left.
+    """
+    samples = {}
+    for scale, result in runs:
+        for stage in result.stages:
+            if stage.error is not None:
+                continue
+            points = samples.setdefault(stage.name, [])
+            if stage.elapsed >= min_time:
+                points.append((scale, stage.elapsed))
+    fitted = {}
+    for name, points in samples.items():
+        k = None
+        if len(points) >= 2:
+            k = fit_exponent(*zip(*points))
+        fitted[name] = k, len(points)
+    return fitted
+
+
+def format_exponent(prefix, name, k, n_runs):
+    if k is None:
+        return f"{prefix}{name.replace('_', ' ')}: too fast to fit"
+    return f"{prefix}{name.replace('_', ' ')}: O(n^{k:.2f}) over {n_runs} sizes"
@@ -0,0 +1,241 @@
+"""
+Graph searches on integer node ids.
+
+The nodes of a graph are ``0 .. n_nodes - 1``, the cells of a dense grid of
+``shape`` being numbered in row-major order (``np.ravel_multi_index``). A
+graph is given by a ``neighbors(u)`` function, yielding the ``v`` next to
+``u`` or the ``(v, cost)`` for weighted searches; ``grid_neighbors`` builds
+one for grids. Visited nodes are kept in a ``bytearray`` and distances in an
+``array``: no tuple is hashed.
+
+``grid_bfs`` is the vectorized counterpart of ``bfs`` on grids, the whole
+frontier of each level being expanded at once with numpy.
+"""
+import collections
+import heapq
+from array import array
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+UNREACHED = -1
+
+
+def _strides(shape):
+    strides, stride = [], 1
+    for n in reversed(shape):
+        strides.append(stride)
+        stride *= n
+    return strides[::-1]
+
+
+def grid_neighbors(shape, passable=None, allowed=None) -> Callable:
+    """
+    ``neighbors`` function of the cells of a grid of ``shape``, in any number
+    of dimensions, moving along one axis at a time. ``passable`` is a boolean
+    array of ``shape`` of the cells which can be entered, and ``allowed(u, v)``
+    filters the moves between cells.
+
+    >>> neighbors = grid_neighbors((2, 3))
+    >>> list(neighbors(0)), list(neighbors(4))
+    ([3, 1], [1, 3, 5])
+    """
+    axes = list(zip(_strides(shape), shape))
+    is_open = None
+    if passable is not None:
+        import numpy as np
+
+        is_open = np.ascontiguousarray(passable, dtype=np.uint8).tobytes()
+
+    def neighbors(u):
+        for stride, n in axes:
+            k = u // stride % n
+            for v in (u - stride if k > 0 else -1, u + stride if k < n - 1 else -1):
+                if v < 0 or (is_open is not None and not is_open[v]):
+                    continue
+                if allowed is None or allowed(u, v):
+                    yield v
+
+    return neighbors
+
+
+def bfs_order(
+    sources: Iterable[int], neighbors: Callable, n_nodes: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    The ``(node, distance)`` reachable from any of ``sources``, in the order
+    they are visited.
+
+    >>> list(bfs_order([0], grid_neighbors((2, 2)), 4))
+    [(0, 0), (2, 1), (1, 1), (3, 2)]
+    """
+    visited = bytearray(n_nodes)
+    frontier = collections.deque()
+    for s in sources:
+        if not visited[s]:
+            visited[s] = 1
+            frontier.append((s, 0))
+    while frontier:
+        u, d = frontier.popleft()
+        yield u, d
+        for v in neighbors(u):
+            if not visited[v]:
+                visited[v] = 1
+                frontier.append((v, d + 1))
+
+
+def bfs(sources, neighbors, n_nodes, target: Optional[int] = None) -> array:
+    """
+    Distance of every node from the closest of ``sources``, ``UNREACHED`` if
+    none leads to it. The search stops early once ``target`` is reached.
+    """
+    dist = array("q", [UNREACHED]) * n_nodes
+    for u, d in bfs_order(sources, neighbors, n_nodes):
+        dist[u] = d
+        if u == target:
+            break
+    return dist
+
+
+def zero_one_bfs(sources, neighbors, n_nodes, target: Optional[int] = None) -> array:
+    """
+    ``bfs`` on a graph whose edges cost 0 or 1, ``neighbors`` yielding
+    ``(v, cost)``.
+
+    >>> def neighbors(u):
+    ...     yield from {0: [(1, 1), (2, 0)], 2: [(1, 0)]}.get(u, [])
+    >>> list(zero_one_bfs([0], neighbors, 3))
+    [0, 0, 0]
+    """
+    dist = array("q", [UNREACHED]) * n_nodes
+    done = bytearray(n_nodes)
+    frontier = collections.deque()
+    for s in sources:
+        dist[s] = 0
+        frontier.append(s)
+    while frontier:
+        u = frontier.popleft()
+        if done[u]:
+            continue
+        done[u] = 1
+        if u == target:
+            break
+        for v, cost in neighbors(u):
+            d = dist[u] + cost
+            if not done[v] and (dist[v] == UNREACHED or d < dist[v]):
+                dist[v] = d
+                if cost:
+                    frontier.append(v)
+                else:
+                    frontier.appendleft(v)
+    return dist
+
+
+def dijkstra(sources, neighbors, n_nodes, target: Optional[int] = None) -> array:
+    """
+    Cost of the cheapest path to every node from any of ``sources``, with
+    non-negative edge costs: ``neighbors`` yields ``(v, cost)``.
+
+    >>> def neighbors(u):
+    ...     yield from {0: [(1, 4), (2, 1)], 2: [(1, 2)]}.get(u, [])
+    >>> list(dijkstra([0], neighbors, 4))
+    [0, 3, 1, -1]
+    """
+    return astar(sources, neighbors, n_nodes, target=target)
+
+
+def astar(
+    sources, neighbors, n_nodes, target: Optional[int] = None, heuristic=None
+) -> array:
+    """
+    ``dijkstra``, guided towards ``target`` by ``heuristic(u)``, a lower
+    bound of the cost from ``u`` to ``target``.
+
+    >>> def neighbors(u):
+    ...     yield from {0: [(1, 4), (2, 1)], 2: [(1, 2)], 1: [(3, 1)]}.get(u, [])
+    >>> astar([0], neighbors, 4, target=3, heuristic=lambda u: u != 3)[3]
+    4
+    """
+    dist = array("q", [UNREACHED]) * n_nodes
+    done = bytearray(n_nodes)
+    frontier = []
+    for s in sources:
+        dist[s] = 0
+        frontier.append((heuristic(s) if heuristic else 0, s))
+    heapq.heapify(frontier)
+    while frontier:
+        _, u = heapq.heappop(frontier)
+        if done[u]:
+            continue
+        done[u] = 1
+        if u == target:
+            break
+        for v, cost in neighbors(u):
+            d = dist[u] + cost
+            if not done[v] and (dist[v] == UNREACHED or d < dist[v]):
+                dist[v] = d
+                heapq.heappush(frontier, (d + heuristic(v) if heuristic else d, v))
+    return dist
+
+
+def grid_bfs(sources, passable, allowed=None, target: Optional[int] = None):
+    """
+    ``bfs`` on the grid of the ``passable`` boolean array, as an int64 array
+    of its shape. ``allowed(u, v)`` is called with arrays of node ids, and
+    returns whether each move is allowed.
+
+    >>> import numpy as np
+    >>> grid = np.array([[1, 1, 1], [0, 0, 1], [1, 1, 1]], dtype=bool)
+    >>> grid_bfs([0], grid)
+    array([[ 0,  1,  2],
+           [-1, -1,  3],
+           [ 6,  5,  4]])
+    """
+    import numpy as np
+
+    shape = passable.shape
+    is_open = np.ascontiguousarray(passable, dtype=bool).ravel()
+    dist = np.full(is_open.size, UNREACHED, dtype=np.int64)
+    visited = np.zeros(is_open.size, dtype=bool)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    visited[frontier] = True
+    d = 0
+    while frontier.size:
+        dist[frontier] = d
+        if target is not None and visited[target]:
+            break
+        reached = []
+        for stride, n in zip(_strides(shape), shape):
+            k = frontier // stride % n
+            for delta, ok in ((-stride, k > 0), (stride, k < n - 1)):
+                u = frontier[ok]
+                v = u + delta
+                keep = is_open[v] & ~visited[v]
+                if allowed is not None:
+                    keep &= allowed(u, v)
+                reached.append(v[keep])
+        frontier = np.unique(np.concatenate(reached))
+        visited[frontier] = True
+        d += 1
+    return dist.reshape(shape)
+
+
+def grid_spread(mask, stay=True):
+    """
+    Cells of a grid at most one move away from the cells of the boolean
+    ``mask`` (exactly one without ``stay``), the frontier of searches whose
+    graph changes at each step.
+
+    >>> import numpy as np
+    >>> grid_spread(np.array([[0, 0, 0], [0, 1, 0]], dtype=bool)).astype(int)
+    array([[0, 1, 0],
+           [1, 1, 1]])
+    """
+    import numpy as np
+
+    spread = mask.copy() if stay else np.zeros_like(mask)
+    for axis in range(mask.ndim):
+        lo = [slice(None)] * mask.ndim
+        hi = [slice(None)] * mask.ndim
+        lo[axis], hi[axis] = slice(None, -1), slice(1, None)
+        spread[tuple(lo)] |= mask[tuple(hi)]
+        spread[tuple(hi)] |= mask[tuple(lo)]
+    return spread
@@ -0,0 +1,121 @@
+"""
+Check the answers of the days against the expected values of their
+``aoc_inputs()``, as a gate: the most expensive inputs are started first on
+a pool of workers, and the check can stop at the first wrong answer.
+"""
+import contextlib
+import traceback
+from typing import Dict, Iterator, List, Tuple
+
+import aoc
+from aoc import history
+
+Check = Tuple[str, str, tuple]
+
+
+def collect(days) -> List[Check]:
+    """
+    The (day, key, expected answers) of every input of ``days`` having at
+    least one expected answer.
+    """
+    checks = []
+    for day in days:
+        for key, (_, *expected) in aoc.aoc_inputs(day).items():
+            if any(e is not None for e in expected):
+                checks.append((day, key, tuple(expected)))
+    return checks
+
+
+def costs(path=history.HISTORY_FILE) -> Dict[str, float]:
+    """
+    Cost of each "day.key" job: the median of its runs in the history, or
+    else its last recorded timing.
+    """
+    timings = aoc.load_timings()
+    if path.exists():
+        timings.update(history.job_costs(path=path))
+    return timings
+
+
+def check_job(day, key, options=None, run=aoc.run_job, **kwargs) -> "aoc.RunResult":
+    """
+    ``run``, with the exception raised by a part reported as the error of
+    the job instead of stopping the check. ``kwargs`` are given to ``run``.
+    """
+    try:
+        return run(day, key, options=options, **kwargs)
+    except Exception as e:
+        stage = aoc.StageResult("run", 0.0)
+        stage.error = traceback.format_exception_only(type(e), e)[-1].strip()
+        return aoc.RunResult(day, key, [stage])
+
+
+def _run_parallel(jobs, n_jobs, **kwargs):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [executor.submit(check_job, day, key, **kwargs) for day, key in jobs]
+        try:
+            for f in as_completed(futures):
+                yield f.result()
+        finally:
+            # Reached early when the caller stops at a failure
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run(jobs, n_jobs=1, fail_fast=False, **kwargs) -> Iterator["aoc.RunResult"]:
+    """
+    Results of the jobs as they complete, ``kwargs`` are given to
+    ``check_job``. With ``fail_fast``, no job is started after a failure.
+    """
+    if n_jobs == 1:
+        results = (check_job(day, key, **kwargs) for day, key in jobs)
+    else:
+        results = _run_parallel(jobs, n_jobs, **kwargs)
+    with contextlib.closing(results):
+        for result in results:
+            yield result
+            if fail_fast and not result.ok:
+                return
+
+
+def stage_status(result, name) -> str:
+    for stage in result.stages:
+        if stage.name == name:
+            if stage.error is not None:
+                return "error"
+            if stage.expected is None:
+                return "-"
+            return "ok" if stage.ok else "FAIL"
+    return "error" if not result.ok else "-"
+
+
+def format_table(checks: List[Check], results) -> List[str]:
+    """
+    One line per check, in the order of ``checks``: the status of each part
+    and the elapsed time, or "skipped" for the checks not run.
+
+    >>> r = aoc.RunResult("day1", "real", [
+    ...     aoc.StageResult("parse", 0.5),
+    ...     aoc.StageResult("part_1", 1.0, value=3, expected=3),
+    ...     aoc.StageResult("part_2", 2.0, value=4)])
+    >>> print("\\n".join(format_table([("day1", "real", (3, None)),
+    ...     ("day2", "real", (1, 2))], [r])))
+    input        part 1  part 2   elapsed
+    day1.real    ok      -        3.5000s
+    day2.real    skipped
+    """
+    by_job = {(r.day, r.key): r for r in results}
+    width = max([len("input")] + [len(f"{d}.{k}") for d, k, _ in checks]) + 4
+    lines = [f"{'input':<{width}}{'part 1':<8}{'part 2':<8}{'elapsed':>8}"]
+    for day, key, _ in checks:
+        job = f"{day}.{key}"
+        if (r := by_job.get((day, key))) is None:
+            lines.append(f"{job:<{width}}skipped")
+            continue
+        p1, p2 = stage_status(r, "part_1"), stage_status(r, "part_2")
+        line = f"{job:<{width}}{p1:<8}{p2:<8}{r.elapsed:>7.4f}s"
+        if not r.ok:
+            line = f"{aoc.C_RED}{line}{aoc.C_ENDCOLOR}"
+        lines.append(line)
+    return lines
@@ -0,0 +1,245 @@
+"""
+Adapters running the Python solvers of the other years of the repository
+like the days of this package.
+
+Each year has its own entry point convention:
+
+* 2018: ``main()`` reads the input on stdin and prints "Part 1: ...",
+* 2019: ``main()`` opens its own input under ``assets/`` and prints
+  "part 1: ...", after asserting on the examples,
+* 2020: ``aoc_run(path)`` prints "part 1: ...".
+
+A solver is run in a child process, to isolate its working directory,
+imports and stdin. The lines it prints are timestamped as they are written:
+part 1 is timed up to the line of its answer, and part 2 from there to its
+own answer.
+"""
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aoc
+
+REPO = Path(__file__).resolve().parents[2]
+PART_RE = re.compile(r"part ([12])\s*:\s*(.*)", re.IGNORECASE)
+
+
+@dataclass
+class Year:
+    # Where the solvers are, also the working directory they are run from
+    directory: Path
+    # "main" or "aoc_run"
+    entry: str
+    # Inputs of a day, from the name of the files of ``assets``: the day is
+    # the first group, the optional second one is the key.
+    input_re: Optional[re.Pattern] = None
+    assets: Optional[Path] = None
+
+
+YEARS = {
+    "2018": Year(
+        REPO / "2018" / "python",
+        "main",
+        re.compile(r"day(\d+)(?:_(.+))?\.txt"),
+        REPO / "2018" / "assets",
+    ),
+    # The inputs are hard-coded in the solvers
+    "2019": Year(REPO / "2019" / "python", "main"),
+    "2020": Year(
+        REPO / "2020",
+        "aoc_run",
+        re.compile(r"day(\d+)-(.+)"),
+        REPO / "2020" / "assets",
+    ),
+}
+
+
+def is_legacy(day: str) -> bool:
+    return "/" in day
+
+
+def split_day(day: str) -> Tuple[str, str]:
+    """
+    >>> split_day("2018/day3")
+    ('2018', 'day3')
+    """
+    year, name = day.split("/")
+    return year, name
+
+
+def solvers(year: str) -> List[str]:
+    """
+    Days of ``year`` having a Python solver, as "year/dayN".
+    """
+    paths = YEARS[year].directory.glob("day*.py")
+    days = [p.stem for p in paths if re.fullmatch(r"day\d+", p.stem)]
+    return [f"{year}/{d}" for d in sorted(days, key=lambda d: int(d[3:]))]
+
+
+def inputs(day: str) -> Dict[str, Optional[Path]]:
+    """
+    Inputs of a day by key, a single None for the solvers which open their
+    own. Days without any input in ``assets`` have none.
+    """
+    year, name = split_day(day)
+    y = YEARS[year]
+    if y.input_re is None:
+        return {"input": None}
+    found = {}
+    for p in sorted(y.assets.iterdir()):
+        m = y.input_re.fullmatch(p.name)
+        if m and f"day{m.group(1)}" == name:
+            found[m.group(2) or "input"] = p
+    return found
+
+
+def list_jobs(years) -> List[Tuple[str, str]]:
+    return [
+        (day, key) for year in years for day in solvers(year) for key in inputs(day)
+    ]
+
+
+class StampedWriter:
+    """
+    Text stream keeping the lines written to it, with the time at which each
+    was completed.
+    """
+
+    def __init__(self, t0):
+        self.t0 = t0
+        self.current = ""
+        self.lines = []
+
+    def write(self, s):
+        self.current += s
+        if "\n" in self.current:
+            t = time.monotonic() - self.t0
+            *lines, self.current = self.current.split("\n")
+            self.lines.extend((t, line) for line in lines)
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+def child_main(day, path):
+    """
+    Run a solver in the current process, and print a JSON report of the
+    lines it printed.
+    """
+    year, name = split_day(day)
+    y = YEARS[year]
+    path = os.path.abspath(path) if path else None
+    os.chdir(y.directory)
+    sys.path.insert(0, str(y.directory))
+    stdout = sys.stdout
+    t_start = time.monotonic()
+    sys.stdout = out = StampedWriter(t_start)
+    report = {"import": None, "error": None}
+    try:
+        spec = importlib.util.spec_from_file_location(name, f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        report["import"] = time.monotonic() - t_start
+        out.t0 = time.monotonic()
+        entry = getattr(module, y.entry)
+        if y.entry == "aoc_run":
+            entry(path) if path else entry()
+        else:
+            if path:
+                sys.stdin = open(path)
+            entry()
+    except BaseException as e:
+        report["error"] = traceback.format_exception_only(type(e), e)[-1].strip()
+    finally:
+        sys.stdout = stdout
+    report["end"] = time.monotonic() - out.t0
+    report["lines"] = out.lines + (
+        [(report["end"], out.current)] if out.current else []
+    )
+    json.dump(report, stdout)
+
+
+def parse_report(day, report, expected=(None, None)) -> List[aoc.StageResult]:
+    """
+    Stages of a solver from the lines it printed: part 1 is the last answer
+    before the first answer to part 2, which can follow logs or examples.
+
+    >>> report = {"import": 0.1, "error": None, "end": 3.0, "lines": [
+    ...     (0.5, "example: 7"), (1.0, "Part 1: 42"), (2.5, "part 2: abc")]}
+    >>> [(s.name, s.elapsed, s.value) for s in parse_report("2018/day1", report)]
+    [('import', 0.1, '2018/day1'), ('part_1', 1.0, '42'), ('part_2', 1.5, 'abc')]
+    """
+    stages = [aoc.StageResult("import", report["import"] or 0.0, value=day)]
+    answers = {}
+    for t, line in report["lines"]:
+        if m := PART_RE.search(line):
+            part, value = m.groups()
+            if part == "2" or "2" not in answers:
+                answers[part] = (t, value.strip())
+    t_prev = 0.0
+    for part, check in zip("12", expected):
+        stage = aoc.StageResult(f"part_{part}", 0.0, expected=check)
+        if part in answers:
+            t, stage.value = answers[part]
+            stage.elapsed = t - t_prev
+            t_prev = t
+        else:
+            stage.elapsed = report["end"] - t_prev
+            t_prev = report["end"]
+            stage.error = report["error"] or "no answer printed"
+        stages.append(stage)
+    if report["error"] and all(s.error is None for s in stages):
+        stages[-1].error = report["error"]
+    return stages
+
+
+def run_job(day, key, verbose=False, options=None, timeout=None, answers=None):
+    """
+    Counterpart of ``aoc.run_job`` for the solvers of the other years.
+    ``answers`` maps "day.key" jobs to the expected answers of both parts.
+    """
+    path = inputs(day)[key]
+    cmd = [sys.executable, "-m", "aoc.years", day, str(path) if path else ""]
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[1]))
+    expected = tuple((answers or {}).get(f"{day}.{key}", (None, None)))
+    try:
+        proc = subprocess.run(
+            cmd, stdout=subprocess.PIPE, text=True, env=env, timeout=timeout
+        )
+        report = json.loads(proc.stdout)
+    except subprocess.TimeoutExpired:
+        error = f"timeout after {timeout}s"
+        report = {"import": None, "error": error, "end": timeout, "lines": []}
+    except json.JSONDecodeError:
+        error = f"crashed with exit code {proc.returncode}"
+        report = {"import": None, "error": error, "end": 0.0, "lines": []}
+    result = aoc.RunResult(day, key, parse_report(day, report, expected))
+    if verbose:
+        for stage in result.stages:
+            print(aoc.format_stage(f"[{day}.{key}] ", stage))
+    return result
+
+
+def run_any(day, key, **kwargs):
+    """
+    Run a job of any year, the days of this package being "dayN". These
+    are run in process, without the ``timeout`` of the other years.
+    """
+    if is_legacy(day):
+        return run_job(day, key, **kwargs)
+    kwargs.pop("timeout", None)
+    kwargs.pop("answers", None)
+    return aoc.run_job(day, key, **kwargs)
+
+
+if __name__ == "__main__":
+    child_main(sys.argv[1], sys.argv[2])